@@ -7,9 +7,13 @@ Run with:
 
 import os
 import sys
+import time
+import queue
 import tempfile
+import threading
 import csv
 import io
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List
 
@@ -19,23 +23,8 @@ from openpyxl import load_workbook
 # Ensure the src package is importable
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from src.po_translate_en_to_nb import (
-    AVAILABLE_MODELS,
-    TARGET_LANGUAGES,
-    SOURCE_LANGUAGES,
-    translate_po_file,
-    build_work_items,
-    load_context,
-    get_defaults,
-    format_glossary_for_prompt,
-)
-from src.xliff_translate import (
-    translate_xliff_file,
-    build_work_items_xliff,
-)
 from src.cost_estimator import estimate_cost
 import xml.etree.ElementTree as ET
-import polib
 
 # ─── Page config ───────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -45,30 +34,15 @@ st.set_page_config(
 )
 
 # ─── Custom CSS ────────────────────────────────────────────────────────────────
-st.markdown("""
-<style>
-    .stApp { max-width: 1200px; margin: 0 auto; }
-    div[data-testid="stMetric"] {
-        background-color: #f0f2f6;
-        border-radius: 8px;
-        padding: 12px 16px;
-    }
-    .success-box {
-        background-color: #d4edda;
-        border: 1px solid #c3e6cb;
-        border-radius: 8px;
-        padding: 16px;
-        margin: 8px 0;
-    }
-    .warning-box {
-        background-color: #fff3cd;
-        border: 1px solid #ffeeba;
-        border-radius: 8px;
-        padding: 16px;
-        margin: 8px 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource(show_spinner=False)
+def _custom_css() -> str:
+    """Read src/static/custom.css once per process."""
+    return (Path(__file__).resolve().parent / "static" / "custom.css").read_text(encoding="utf-8")
+
+
+# Streamlit drops elements a rerun doesn't emit, so this stays unconditional;
+# the frontend skips re-applying it when the content is unchanged.
+st.markdown(f"<style>\n{_custom_css()}</style>", unsafe_allow_html=True)
 
 
 def _dedupe_glossary(entries: List[Dict[str, str]]) -> List[Dict[str, str]]:
@@ -165,12 +139,116 @@ def _parse_glossary_upload(uploaded_file) -> List[Dict[str, str]]:
     return _dedupe_glossary(parsed)
 
 
+# ─── Engines ───────────────────────────────────────────────────────────────────
+# Imported on first use so the page can paint before openai/httpx/polib load.
+@st.cache_resource(show_spinner=False)
+def _po_engine():
+    """The PO translation module (src.po_translate_en_to_nb)."""
+    from src import po_translate_en_to_nb
+    return po_translate_en_to_nb
+
+
+@st.cache_resource(show_spinner=False)
+def _xliff_engine():
+    """The XLIFF translation module (src.xliff_translate)."""
+    from src import xliff_translate
+    return xliff_translate
+
+
+# st.cache_data pickles its values and unpickles a copy on every rerun, so
+# the upload caches below hold plain dicts and strings only — never the
+# parsed POFile or its entries. Keep only the last few uploads/option sets
+# so a long-lived server doesn't grow without bound.
+_UPLOAD_CACHE_ENTRIES = 8
+_PREVIEW_ROWS = 100
+
+
+@st.cache_data(show_spinner=False, max_entries=_UPLOAD_CACHE_ENTRIES)
+def _build_items(po_bytes: bytes, source_lang: str, force: bool, target_lang: str):
+    """
+    build_work_items() for the uploaded bytes and detection options.
+
+    Returns (work_items, preview_rows, total_entries); the rows for the
+    "Preview entries" table are taken here, while the entries are at hand.
+    """
+    import polib
+    po = polib.pofile(po_bytes.decode("utf-8"), encoding="utf-8")
+    work_items, id_map, total_entries = _po_engine().build_work_items(
+        po, source_lang=source_lang, force=force, target_lang=target_lang
+    )
+    preview_rows = []
+    for item in work_items[:_PREVIEW_ROWS]:
+        entry_obj, src_field = id_map[item["id"]]
+        preview_rows.append({
+            "Source lang": item["lang"],
+            "Source field": src_field,
+            "Text": item["text"][:120],
+            "Current msgstr": entry_obj.msgstr[:120] if entry_obj.msgstr else "—",
+        })
+    return work_items, preview_rows, total_entries
+
+
+@st.cache_data(show_spinner=False, max_entries=_UPLOAD_CACHE_ENTRIES)
+def _send_plan(po_bytes: bytes, source_lang: str, force: bool, target_lang: str, batch_size: int):
+    """The items a run would send (trivial/duplicate entries removed) and its request count."""
+    engine = _po_engine()
+    work_items, _rows, _total = _build_items(po_bytes, source_lang, force, target_lang)
+    send_items, _fanout = engine.items_to_send(work_items)
+    max_tokens = engine.get_defaults()["max_batch_tokens"]
+    return send_items, len(engine.pack_batches(send_items, max_items=batch_size, max_tokens=max_tokens))
+
+
+def _session_tmpdir() -> Path:
+    """
+    Scratch directory for this session's input and output files.
+
+    TemporaryDirectory removes itself when the session state is dropped, or
+    at interpreter exit at the latest.
+    """
+    tmpdir = st.session_state.get("tmpdir")
+    if tmpdir is None:
+        tmpdir = tempfile.TemporaryDirectory(prefix="po-translator-")
+        st.session_state.tmpdir = tmpdir
+    return Path(tmpdir.name)
+
+
+@st.cache_data(show_spinner=False, max_entries=_UPLOAD_CACHE_ENTRIES)
+def _result_preview(po_bytes: bytes, limit: int = 50) -> List[Dict[str, str]]:
+    """First *limit* msgid/msgstr rows of a translated PO file, built once per output."""
+    import polib
+    po_out = polib.pofile(po_bytes.decode("utf-8"))
+    rows = []
+    for entry in po_out:
+        if not entry.msgid or entry.obsolete:
+            continue
+        rows.append({
+            "msgid": entry.msgid[:80],
+            "msgstr": entry.msgstr[:80] if entry.msgstr else "—",
+        })
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def _materialise_upload(uploaded_file, suffix: str) -> str:
+    """Write the upload into the session directory once per file_id and return its path."""
+    tmp_input = _session_tmpdir() / f"upload-{uploaded_file.file_id}{suffix}"
+    if not tmp_input.exists():
+        tmp_input.write_bytes(uploaded_file.getvalue())
+    return str(tmp_input)
+
+
 def main():
     st.title("🌍 Translation File Translator")
     st.caption("Translate .po (Poedit) and .xlf (XLIFF) files using OpenAI — preserving placeholders, inline markup, and formatting.")
 
+    engine = _po_engine()
+    AVAILABLE_MODELS = engine.AVAILABLE_MODELS
+    TARGET_LANGUAGES = engine.TARGET_LANGUAGES
+    SOURCE_LANGUAGES = engine.SOURCE_LANGUAGES
+
     # Load user defaults from .env
-    defaults = get_defaults()
+    defaults = engine.get_defaults()
 
     # ─── Sidebar: Settings ─────────────────────────────────────────────────
     with st.sidebar:
@@ -226,6 +304,14 @@ def main():
             help="Items per API call. Smaller = better quality, larger = faster.",
         )
 
+        max_concurrency = st.slider(
+            "Max concurrent API calls",
+            min_value=1,
+            max_value=_MAX_CONCURRENCY,
+            value=min(defaults["max_concurrency"], _MAX_CONCURRENCY),
+            help="Batches sent at the same time. Higher is faster on high rate-limit tiers; lower it if the log shows repeated 429 retries.",
+        )
+
         # Force translate
         force = st.checkbox(
             "Force translate all entries",
@@ -233,6 +319,18 @@ def main():
             help="Translate every entry, even if it already has a translation.",
         )
 
+        bypass_cache = st.checkbox(
+            "Bypass translation cache",
+            value=False,
+            help="PO files only. Translate every entry again instead of reusing translations from earlier runs with the same model, language, glossary and context.",
+        )
+
+        use_batch_api = st.checkbox(
+            "Use Batch API (cheaper, up to 24h)",
+            value=False,
+            help="PO files only. Submits all batches as one OpenAI Batch API job at half the price; check back for results.",
+        )
+
         st.divider()
 
         # Context file
@@ -309,21 +407,21 @@ def main():
         file_ext = Path(uploaded_file.name).suffix.lower()
         is_xliff = file_ext in {".xlf", ".xliff"}
 
-        # ── Save upload to a temp file ──────────────────────────────────────
-        suffix = ".xlf" if is_xliff else ".po"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, mode="wb") as tmp:
-            tmp.write(uploaded_file.getvalue())
-            tmp_input = tmp.name
+        # Identifies a translation run so its output can be reused across reruns
+        run_key = (
+            uploaded_file.file_id, model, batch_size, target_lang, source_lang, force,
+            context_text, tuple((g["source"], g["target"]) for g in glossary), bypass_cache,
+        )
 
         # ── Parse and build work items ──────────────────────────────────────
         if is_xliff:
             try:
-                xliff_tree = ET.parse(tmp_input)
+                xliff_tree = ET.ElementTree(ET.fromstring(uploaded_file.getvalue()))
             except ET.ParseError as e:
                 st.error(f"Failed to parse XLIFF file: {e}")
                 return
 
-            work_items, id_map, total_entries = build_work_items_xliff(
+            work_items, id_map, total_entries = _xliff_engine().build_work_items_xliff(
                 xliff_tree, source_lang=source_lang, force=force
             )
 
@@ -332,12 +430,14 @@ def main():
                 st.metric("To translate", len(work_items))
                 # XLIFF items with markup need smaller batches, cap display
                 eff_batch = min(batch_size, 10)
-                estimated_calls = (len(work_items) + eff_batch - 1) // eff_batch if eff_batch else 0
+                # Identical sources are translated once
+                unique_items, _fanout = _po_engine().dedupe_work_items(work_items, key="source_xml")
+                estimated_calls = (len(unique_items) + eff_batch - 1) // eff_batch if eff_batch else 0
                 st.metric("API calls (est.)", estimated_calls)
 
                 # Cost estimation
-                if work_items:
-                    cost_est = estimate_cost(work_items, model, eff_batch)
+                if unique_items:
+                    cost_est = estimate_cost(unique_items, model, eff_batch)
                     st.metric("Est. tokens", f"{cost_est['estimated_total_tokens']:,}")
                     st.metric("Est. cost", f"${cost_est['estimated_cost_usd']:.4f}")
 
@@ -377,62 +477,62 @@ def main():
                     cli_cmd += ' --context-file "context.json"'
                 st.code(cli_cmd, language="powershell")
 
-            if translate_btn:
+            if translate_btn and _last_output(run_key) is None:
+                tmp_input = _materialise_upload(uploaded_file, ".xlf")
                 _run_xliff_translation(
                     tmp_input, model, batch_size, target_lang, source_lang,
-                    force, context_text, uploaded_file.name, glossary,
+                    force, context_text, uploaded_file.name, glossary, run_key=run_key,
+                    max_concurrency=max_concurrency,
                 )
 
+            last_output = _last_output(run_key)
+            if last_output is not None:
+                _show_xliff_results(last_output["result"], last_output["bytes"], target_lang, uploaded_file.name)
+
         else:
             # ── PO file flow (unchanged) ────────────────────────────────────
             try:
-                po = polib.pofile(tmp_input, encoding="utf-8")
+                work_items, preview_data, total_entries = _build_items(
+                    uploaded_file.getvalue(), source_lang, force, target_lang
+                )
             except Exception as e:
                 st.error(f"Failed to parse PO file: {e}")
                 return
 
-            work_items, id_map, total_entries = build_work_items(
-                po, source_lang=source_lang, force=force
-            )
-
             with col_info:
                 st.metric("Total entries", total_entries)
                 st.metric("To translate", len(work_items))
-                estimated_calls = (len(work_items) + batch_size - 1) // batch_size
+                send_items, estimated_calls = _send_plan(
+                    uploaded_file.getvalue(), source_lang, force, target_lang, batch_size
+                )
                 st.metric("API calls (est.)", estimated_calls)
 
-                # Cost estimation
-                if work_items:
-                    cost_est = estimate_cost(work_items, model, batch_size)
+                # Cost estimation — only unique, non-trivial texts are sent
+                if send_items:
+                    cost_est = estimate_cost(send_items, model, batch_size)
                     st.metric("Est. tokens", f"{cost_est['estimated_total_tokens']:,}")
                     st.metric("Est. cost", f"${cost_est['estimated_cost_usd']:.4f}")
 
             with st.expander("📄 Preview entries to translate", expanded=False):
-                preview_data = []
-                for item in work_items[:100]:
-                    entry_obj, src_field = id_map[item["id"]]
-                    preview_data.append({
-                        "Source lang": item["lang"],
-                        "Source field": src_field,
-                        "Text": item["text"][:120],
-                        "Current msgstr": entry_obj.msgstr[:120] if entry_obj.msgstr else "—",
-                    })
                 st.dataframe(preview_data, use_container_width=True, hide_index=True)
-                if len(work_items) > 100:
-                    st.caption(f"Showing first 100 of {len(work_items)} entries.")
+                if len(work_items) > _PREVIEW_ROWS:
+                    st.caption(f"Showing first {_PREVIEW_ROWS} of {len(work_items)} entries.")
 
             st.divider()
             if not api_key:
                 st.warning("⚠️ Enter your OpenAI API key in the sidebar to translate.")
                 return
 
+            # Each submission is a new paid job; one per file at a time
+            job_pending = use_batch_api and _batch_job_pending(uploaded_file.file_id)
             col_btn, col_cli = st.columns([1, 2])
             with col_btn:
                 translate_btn = st.button(
                     "🚀 Translate",
                     type="primary",
                     use_container_width=True,
-                    disabled=(len(work_items) == 0),
+                    disabled=(len(work_items) == 0 or job_pending),
+                    help="A Batch API job for this file is still running." if job_pending else None,
                 )
             with col_cli:
                 cli_cmd = (
@@ -447,10 +547,24 @@ def main():
                 st.code(cli_cmd, language="powershell")
 
             if translate_btn:
-                _run_translation(
-                    tmp_input, model, batch_size, target_lang, source_lang,
-                    force, context_text, uploaded_file.name, glossary,
-                )
+                tmp_input = _materialise_upload(uploaded_file, ".po")
+                if use_batch_api:
+                    _submit_batch_translation(
+                        uploaded_file.file_id, tmp_input, model, batch_size, target_lang,
+                        source_lang, force, context_text, uploaded_file.name, glossary,
+                    )
+                elif _last_output(run_key) is None:
+                    _run_translation(
+                        tmp_input, model, batch_size, target_lang, source_lang,
+                        force, context_text, uploaded_file.name, glossary, run_key=run_key,
+                        use_cache=not bypass_cache, max_concurrency=max_concurrency,
+                    )
+
+            last_output = _last_output(run_key)
+            if last_output is not None:
+                _show_po_results(last_output["result"], last_output["bytes"], target_lang, uploaded_file.name)
+
+            _show_batch_job(uploaded_file.file_id)
 
     else:
         st.info("👆 Upload a `.po` or `.xlf` file to get started.")
@@ -472,39 +586,119 @@ Placeholders, HTML tags, and XLIFF inline codes (`<g>` elements) are preserved a
             """)
 
 
+def _run_with_live_progress(translate_fn, progress_bar, log_container, unit, *args, **kwargs):
+    """
+    Run a translate_*_file() function on a worker thread and render its progress here.
+
+    The translator's callbacks only enqueue updates; this (script) thread drains
+    the queue a few times per second and touches the widgets, keeping only the
+    latest progress value per tick. If the script is stopped, the next callback
+    raises so the worker winds down too.
+    """
+    updates: "queue.Queue" = queue.Queue()
+    stopped = threading.Event()
+
+    def on_progress(translated, total):
+        if stopped.is_set():
+            raise RuntimeError("Translation cancelled")
+        updates.put(("progress", translated, total))
+
+    def on_log(msg):
+        if stopped.is_set():
+            raise RuntimeError("Translation cancelled")
+        updates.put(("log", msg))
+
+    log_messages: List[str] = []
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(
+        translate_fn, *args, progress_callback=on_progress, log_callback=on_log, **kwargs
+    )
+    try:
+        while True:
+            done = future.done()
+            latest = None
+            new_logs = False
+            while True:
+                try:
+                    kind, *payload = updates.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "progress":
+                    latest = payload
+                else:
+                    log_messages.append(payload[0])
+                    new_logs = True
+            if latest is not None:
+                translated, total = latest
+                pct = translated / total if total > 0 else 1.0
+                progress_bar.progress(pct, text=f"Translated {translated} / {total} {unit}")
+            if new_logs:
+                log_container.text("\n".join(log_messages[-5:]))
+            if done:
+                break
+            time.sleep(0.25)
+    except BaseException:
+        stopped.set()
+        raise
+    finally:
+        executor.shutdown(wait=False)
+    return future.result()
+
+
+# Upper bound of the concurrency slider; the shared client's pool is sized to it
+_MAX_CONCURRENCY = 100
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai_client(api_key: str):
+    """One pooled AsyncOpenAI client per API key, shared across reruns and sessions."""
+    return _po_engine().make_async_client(api_key=api_key, max_connections=_MAX_CONCURRENCY)
+
+
+@st.cache_resource(show_spinner=False)
+def get_translation_cache():
+    """The on-disk translation cache, opened once per process."""
+    from src.translation_cache import TranslationCache
+    return TranslationCache()
+
+
+def _last_output(run_key):
+    """Return the stored output of the last run if it was made with *run_key*."""
+    last_output = st.session_state.get("last_output")
+    if last_output is not None and last_output["key"] == run_key:
+        return last_output
+    return None
+
+
+def _store_output(run_key, result, tmp_output):
+    """Keep a finished run's result and output bytes so reruns don't touch disk."""
+    st.session_state["last_output"] = {
+        "key": run_key,
+        "result": result,
+        "bytes": Path(tmp_output).read_bytes(),
+    }
+
+
 def _run_translation(
     tmp_input, model, batch_size, target_lang, source_lang,
-    force, context_text, original_filename, glossary=None,
+    force, context_text, original_filename, glossary=None, run_key=None,
+    use_cache=True, max_concurrency=8,
 ):
-    """Execute the translation and display results."""
+    """Execute the translation and store its output for display."""
 
-    # Write context to a temp file if provided
-    context_file = None
-    if context_text:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8") as ctx_tmp:
-            ctx_tmp.write(context_text)
-            context_file = ctx_tmp.name
-
-    # Create temp output path
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".po") as out_tmp:
-        tmp_output = out_tmp.name
+    tmp_output = str(_session_tmpdir() / "translated.po")
 
     # Progress bar and log area
     progress_bar = st.progress(0, text="Starting translation…")
     log_container = st.empty()
-    log_messages = []
-
-    def on_progress(translated, total):
-        pct = translated / total if total > 0 else 1.0
-        progress_bar.progress(pct, text=f"Translated {translated} / {total} entries")
-
-    def on_log(msg):
-        log_messages.append(msg)
-        log_container.text("\n".join(log_messages[-5:]))
 
     # Run
     try:
-        result = translate_po_file(
+        result = _run_with_live_progress(
+            _po_engine().translate_po_file,
+            progress_bar,
+            log_container,
+            "entries",
             tmp_input,
             tmp_output,
             model=model,
@@ -512,9 +706,10 @@ def _run_translation(
             target_lang=target_lang,
             source_lang=source_lang,
             force=force,
-            context_file=context_file,
-            progress_callback=on_progress,
-            log_callback=on_log,
+            context_text=context_text,
+            aclient=get_openai_client(os.getenv("OPENAI_API_KEY", "")),
+            cache=get_translation_cache() if use_cache else None,
+            max_concurrency=max_concurrency,
             glossary=glossary,
         )
     except Exception as e:
@@ -522,8 +717,11 @@ def _run_translation(
         return
 
     progress_bar.progress(1.0, text="✅ Translation complete!")
+    _store_output(run_key, result, tmp_output)
+
 
-    # ─── Results ───────────────────────────────────────────────────────────
+def _show_po_results(result, output_bytes, target_lang, original_filename):
+    """Render the summary, warnings, preview and download for a finished PO run."""
     st.divider()
     st.subheader("📊 Results")
 
@@ -555,73 +753,146 @@ def _run_translation(
     # Translation preview
     with st.expander("📋 Translation preview (first 50)", expanded=False):
         try:
-            po_out = polib.pofile(tmp_output, encoding="utf-8")
-            preview = []
-            count = 0
-            for entry in po_out:
-                if entry.msgid == "":
-                    continue
-                preview.append({
-                    "msgid": entry.msgid[:80],
-                    "msgstr": entry.msgstr[:80] if entry.msgstr else "—",
-                })
-                count += 1
-                if count >= 50:
-                    break
-            st.dataframe(preview, use_container_width=True, hide_index=True)
+            st.dataframe(_result_preview(output_bytes), use_container_width=True, hide_index=True)
         except Exception:
             st.warning("Could not load preview.")
 
     # Download button
     st.divider()
     try:
-        output_bytes = Path(tmp_output).read_bytes()
         stem = Path(original_filename).stem
         download_name = f"translated_{target_lang}_{stem}.po"
         st.download_button(
             label=f"⬇️ Download translated .po",
-            data=output_bytes,
+            data=io.BytesIO(output_bytes),
             file_name=download_name,
             mime="application/x-gettext",
             type="primary",
             use_container_width=True,
+            on_click="ignore",
         )
     except Exception as e:
         st.error(f"Could not prepare download: {e}")
 
 
-def _run_xliff_translation(
-    tmp_input, model, batch_size, target_lang, source_lang,
+def _submit_batch_translation(
+    file_id, tmp_input, model, batch_size, target_lang, source_lang,
     force, context_text, original_filename, glossary=None,
 ):
-    """Execute XLIFF translation and display results."""
+    """Submit the PO file as an OpenAI Batch API job and remember it in session_state."""
+    try:
+        with st.spinner("Submitting batch job…"):
+            batch_id = _po_engine().submit_po_batch_job(
+                tmp_input,
+                model=model,
+                batch_size=batch_size,
+                target_lang=target_lang,
+                source_lang=source_lang,
+                force=force,
+                context_text=context_text,
+                glossary=glossary,
+            )
+    except Exception as e:
+        st.error(f"❌ Batch submission failed: {e}")
+        return
 
-    context_file = None
-    if context_text:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8") as ctx_tmp:
-            ctx_tmp.write(context_text)
-            context_file = ctx_tmp.name
+    # The job is collected with the same options it was submitted with
+    st.session_state.setdefault("batch_jobs", {})[file_id] = {
+        "batch_id": batch_id,
+        "tmp_input": tmp_input,
+        "batch_size": batch_size,
+        "source_lang": source_lang,
+        "force": force,
+        "target_lang": target_lang,
+        "original_filename": original_filename,
+    }
+    # Rerun so the Translate button is already disabled for this job
+    st.rerun()
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlf") as out_tmp:
-        tmp_output = out_tmp.name
 
-    progress_bar = st.progress(0, text="Starting XLIFF translation…")
-    log_container = st.empty()
-    log_messages = []
+def _batch_job_pending(file_id) -> bool:
+    """True while the Batch API job submitted for *file_id* has neither results nor a final error."""
+    job = st.session_state.get("batch_jobs", {}).get(file_id)
+    return job is not None and "result" not in job and "error" not in job
 
-    def on_progress(translated, total):
-        pct = translated / total if total > 0 else 1.0
-        progress_bar.progress(pct, text=f"Translated {translated} / {total} trans-units")
 
-    def on_log(msg):
-        log_messages.append(msg)
-        log_container.text("\n".join(log_messages[-5:]))
+@st.fragment
+def _show_batch_job(file_id):
+    """
+    Show the status of a submitted Batch API job and its results once finished.
+
+    Runs as a fragment so "Check status" reruns only this section.
+    """
+    job = st.session_state.get("batch_jobs", {}).get(file_id)
+    if job is None:
+        return
+
+    st.divider()
+    st.subheader("🕒 Batch API job")
+    st.caption(f"Job `{job['batch_id']}` — results are usually ready well within 24 hours.")
+
+    if "error" in job:
+        st.error(f"❌ Batch job failed: {job['error']}")
+        return
+
+    if "result" not in job:
+        if not st.button("🔄 Check status", key=f"batch_check_{job['batch_id']}"):
+            return
+        log_messages = []
+        tmp_output = str(_session_tmpdir() / f"{job['batch_id']}.po")
+        try:
+            with st.spinner("Checking batch job…"):
+                result = _po_engine().collect_po_batch_job(
+                    job["batch_id"],
+                    job["tmp_input"],
+                    tmp_output,
+                    batch_size=job["batch_size"],
+                    target_lang=job["target_lang"],
+                    source_lang=job["source_lang"],
+                    force=job["force"],
+                    wait=30,
+                    log_callback=log_messages.append,
+                )
+        except RuntimeError as e:
+            # The job ended without usable output and won't recover, so the
+            # file may be submitted again
+            job["error"] = str(e)
+            st.rerun()
+        except Exception as e:
+            st.error(f"❌ Batch job failed: {e}")
+            return
+        if result is None:
+            st.info(log_messages[-1] if log_messages else "Batch job is still running.")
+            return
+        job["result"] = result
+        job["output_bytes"] = Path(tmp_output).read_bytes()
+        # Full rerun, so the Translate button outside this fragment is enabled again
+        st.rerun()
+
+    _show_po_results(job["result"], job["output_bytes"], job["target_lang"], job["original_filename"])
+
+
+def _run_xliff_translation(
+    tmp_input, model, batch_size, target_lang, source_lang,
+    force, context_text, original_filename, glossary=None, run_key=None,
+    max_concurrency=8,
+):
+    """Execute XLIFF translation and store its output for display."""
+
+    tmp_output = str(_session_tmpdir() / "translated.xlf")
+
+    progress_bar = st.progress(0, text="Starting XLIFF translation…")
+    log_container = st.empty()
 
     # XLIFF items with markup content work best at smaller batch sizes
     effective_batch = min(batch_size, 10)
 
     try:
-        result = translate_xliff_file(
+        result = _run_with_live_progress(
+            _xliff_engine().translate_xliff_file,
+            progress_bar,
+            log_container,
+            "trans-units",
             tmp_input,
             tmp_output,
             model=model,
@@ -629,17 +900,21 @@ def _run_xliff_translation(
             target_lang=target_lang,
             source_lang=source_lang,
             force=force,
-            context_file=context_file,
-            progress_callback=on_progress,
-            log_callback=on_log,
+            context_text=context_text,
             glossary=glossary,
+            max_concurrency=max_concurrency,
+            aclient=get_openai_client(os.getenv("OPENAI_API_KEY", "")),
         )
     except Exception as e:
         st.error(f"❌ XLIFF translation failed: {e}")
         return
 
     progress_bar.progress(1.0, text="✅ Translation complete!")
+    _store_output(run_key, result, tmp_output)
+
 
+def _show_xliff_results(result, output_bytes, target_lang, original_filename):
+    """Render the summary, warnings and download for a finished XLIFF run."""
     st.divider()
     st.subheader("📊 Results")
 
@@ -670,16 +945,16 @@ def _run_xliff_translation(
     # Download
     st.divider()
     try:
-        output_bytes = Path(tmp_output).read_bytes()
         stem = Path(original_filename).stem
         download_name = f"translated_{target_lang}_{stem}.xlf"
         st.download_button(
             label="⬇️ Download translated .xlf",
-            data=output_bytes,
+            data=io.BytesIO(output_bytes),
             file_name=download_name,
             mime="application/xliff+xml",
             type="primary",
             use_container_width=True,
+            on_click="ignore",
         )
     except Exception as e:
         st.error(f"Could not prepare download: {e}")
@@ -5,7 +5,13 @@ Estimates token usage and API cost based on source text length,
 batch configuration, and model pricing.
 """
 
-from typing import Dict, List, Optional
+import functools
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken  # optional: exact token counts for the dry run
+except ImportError:
+    tiktoken = None
 
 # Approximate pricing per 1M tokens (input / output) as of March 2026.
 # These are rough estimates — actual pricing may change.
@@ -28,11 +34,40 @@ _PROMPT_OVERHEAD_TOKENS = 600
 _OUTPUT_MULTIPLIER = 1.4
 
 
+# Chat framing tokens OpenAI adds per message (role, separators)
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
 def estimate_tokens(text_chars: int) -> int:
     """Estimate token count from character count."""
     return max(1, int(text_chars / _CHARS_PER_TOKEN))
 
 
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken encoding for *model*, or None when tiktoken can't provide one."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Models newer than the installed tiktoken share the 4o tokenizer
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # Encodings are downloaded on first use; offline, fall back to estimates
+        return None
+
+
+@functools.lru_cache(maxsize=256)
+def count_tokens(text: str, model: str = "gpt-4.1") -> int:
+    """Token count of *text*: exact with tiktoken installed, else estimated from its length."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return estimate_tokens(len(text))
+    return len(encoding.encode(text))
+
+
 def estimate_cost(
     work_items: List[Dict],
     model: str = "gpt-4.1",
@@ -78,3 +113,46 @@ def estimate_cost(
         "model": model,
         "pricing_per_1m": pricing,
     }
+
+
+def estimate_prompt_cost(
+    prompts: Sequence[Tuple[str, str]],
+    source_texts: Sequence[str],
+    model: str = "gpt-4.1",
+) -> Dict:
+    """
+    Estimate token usage and cost from the actual requests of a run.
+
+    Parameters
+    ----------
+    prompts      : (system_prompt, user_prompt) per API call
+    source_texts : the texts being translated; output is sized from them
+    model        : model identifier
+
+    Returns
+    -------
+    dict with keys:
+        estimated_input_tokens, estimated_output_tokens, estimated_total_tokens,
+        estimated_api_calls, estimated_cost_usd, model, pricing_per_1m,
+        tokenizer ("tiktoken" or "estimate")
+    """
+    input_tokens = sum(
+        count_tokens(system, model) + count_tokens(user, model) + 2 * _MESSAGE_OVERHEAD_TOKENS
+        for system, user in prompts
+    )
+    source_tokens = sum(count_tokens(text, model) for text in source_texts)
+    output_tokens = int(source_tokens * _OUTPUT_MULTIPLIER)
+
+    pricing = _MODEL_PRICING.get(model, _MODEL_PRICING["gpt-4.1"])
+    total_cost = (input_tokens / 1_000_000) * pricing["input"] + (output_tokens / 1_000_000) * pricing["output"]
+
+    return {
+        "estimated_input_tokens": input_tokens,
+        "estimated_output_tokens": output_tokens,
+        "estimated_total_tokens": input_tokens + output_tokens,
+        "estimated_api_calls": len(prompts),
+        "estimated_cost_usd": round(total_cost, 4),
+        "model": model,
+        "pricing_per_1m": pricing,
+        "tokenizer": "tiktoken" if _encoding(model) is not None else "estimate",
+    }
@@ -12,7 +12,7 @@ Supports English and German source text → target languages:
 
 - Preserves: comments, msgctxt, metadata, placeholders, punctuation, capitalization, HTML tags.
 - Validates that placeholders survive translation and warns if any are dropped.
-- Uses JSON mode for reliable structured API responses.
+- Uses structured outputs (a strict JSON schema) for reliable API responses.
 - Accepts a domain context file (--context-file) for specialised terminology.
 
 Usage:
@@ -22,81 +22,305 @@ Usage:
 import os
 import re
 import json
+import time
+import queue
+import atexit
+import asyncio
+import contextlib
 import argparse
+import functools
+import hashlib
+import importlib.util
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Set, Any
+from typing import List, Dict, Optional, Set, Tuple, Any
+import httpx
 import polib
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 from tqdm import tqdm
 
+try:
+    import orjson  # optional: several times faster than json for prompts/responses
+except ImportError:
+    orjson = None
+
+try:
+    import re2  # optional: google-re2, linear-time matching for the placeholder scans
+except ImportError:
+    re2 = None
+
+try:
+    import hyperscan  # optional: one DFA pass for both language-hint word lists
+except ImportError:
+    hyperscan = None
+
 # Load .env from project root (searches upward from this file)
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 load_dotenv(_PROJECT_ROOT / ".env")
 
-# ---- Simple heuristic to guess if a string is English-looking (ASCII + common words) ----
-_EN_HINTS = re.compile(r"\b(accept|settings|cookie|filter|configure|products?|reviews?|customer|archive|example|save|cancel|next|previous|email|password|sign|log|home|about|contact|help)\b", re.I)
 
-def looks_english(s: str) -> bool:
-    """Check if a string looks like English text."""
+def _json_dumps(obj: Any) -> str:
+    """Serialise to a compact, non-ASCII-escaped JSON string."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_loads(text: str) -> Any:
+    """Parse JSON; raises json.JSONDecodeError (orjson's error subclasses it)."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# RE2's \w, \s and \d are ASCII-only. These classes match what re's match
+# on str (for every code point assigned in unicodedata), so a placeholder
+# like {navn_på_fil} is found with or without RE2 installed.
+_RE2_UNICODE_CLASSES = {
+    "w": r"\p{L}\p{N}_",
+    "s": r"\s\x{0b}\p{Z}\x{1c}-\x{1f}\x{85}",
+    "d": r"\p{Nd}",
+}
+
+
+def _re2_unicode_pattern(pattern: str) -> Optional[str]:
+    r"""
+    *pattern* with \w/\s/\d (and their negations) spelled as Unicode classes
+    for RE2, or None if it uses an escape RE2 can't express that way (\b, \B,
+    or \W/\S inside [...]).
+    """
+    out: List[str] = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern):
+            esc = pattern[i + 1]
+            i += 2
+            cls = _RE2_UNICODE_CLASSES.get(esc.lower())
+            if esc in "bB":
+                return None
+            if cls is None:
+                out.append("\\" + esc)
+            elif in_class:
+                if esc.isupper() and esc != "D":
+                    return None
+                out.append(r"\P{Nd}" if esc == "D" else cls)
+            else:
+                out.append(f"[^{cls}]" if esc.isupper() else f"[{cls}]")
+            continue
+        if ch == "[" and not in_class:
+            in_class = True
+            out.append(ch)
+            i += 1
+            # A leading ^ and a ] right after the opening bracket are literal
+            if pattern.startswith("^", i):
+                out.append("^")
+                i += 1
+            if pattern.startswith("]", i):
+                out.append("]")
+                i += 1
+            continue
+        if ch == "]" and in_class:
+            in_class = False
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _compile_linear(pattern: str):
+    r"""
+    Compile *pattern* with RE2 when it is installed, else with re.
+
+    Only for patterns used via finditer()/group(); flags must be inline
+    (e.g. "(?i)") because RE2's compile() takes none. Either way \w, \s and
+    \d have re's Unicode meaning.
+    """
+    if re2 is not None:
+        unicode_pattern = _re2_unicode_pattern(pattern)
+        if unicode_pattern is not None:
+            try:
+                return re2.compile(unicode_pattern)
+            except re2.error:
+                pass  # syntax RE2 does not support — fall back to re
+    return re.compile(pattern)
+
+
+# ---- Simple heuristics to guess if a string looks English or German ----
+# English: ASCII-only and contains a common English UI word.
+# German: contains umlauts/ß or a common German word.
+_EN_WORDS = r"accept|settings|cookie|filter|configure|products?|reviews?|customer|archive|example|save|cancel|next|previous|email|password|sign|log|home|about|contact|help"
+_DE_WORDS = r"der|die|das|und|ist|nicht|für|mit|ein|eine|zu|von|auf|als|auch"
+# Both word lists in one pattern so a string is scanned once for either
+_LANG_HINTS = re.compile(rf"\b(?:(?P<en>{_EN_WORDS})|(?P<de>{_DE_WORDS}))\b", re.I)
+_DE_CHARS = frozenset("äöüßÄÖÜ")
+
+
+def _compile_hint_db():
+    """Hyperscan database reporting id 0 for an English and 1 for a German word, or None."""
+    if hyperscan is None:
+        return None
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+    # Hyperscan has no \b in UCP mode; spell the boundary out as re's \w
+    # (letters, digits, underscore). Only match existence matters here.
+    edge = r"[^\p{L}\p{N}_]"
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=[
+                rf"(?:^|{edge})(?:{words})(?:$|{edge})".encode()
+                for words in (_EN_WORDS, _DE_WORDS)
+            ],
+            ids=[0, 1],
+            elements=2,
+            flags=[flags, flags],
+        )
+    except Exception:
+        return None  # unsupported build/platform — fall back to re
+    return db
+
+
+_HINT_DB = _compile_hint_db()
+# A database has one scratch space, so scans must not overlap
+_HINT_DB_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8192)
+def lang_hints(s: str) -> Tuple[bool, bool]:
+    """Return (looks_english, looks_german) for *s*."""
     if not s:
-        return False
-    # ASCII-ish and/or contains common English UI words
-    asciiish = all(ord(c) < 128 for c in s)
-    return asciiish and bool(_EN_HINTS.search(s))
+        return False, False
+    ascii_only = s.isascii()
+    has_en = False
+    has_de = not ascii_only and not _DE_CHARS.isdisjoint(s)
+    if _HINT_DB is not None:
+        found = set()
+        with _HINT_DB_LOCK:
+            _HINT_DB.scan(s.encode("utf-8"), match_event_handler=lambda id_, *_: found.add(id_))
+        return ascii_only and 0 in found, has_de or 1 in found
+    for m in _LANG_HINTS.finditer(s):
+        if m.lastgroup == "en":
+            has_en = True
+        else:
+            has_de = True
+        if has_en and has_de:
+            break
+    return ascii_only and has_en, has_de
 
+def detect_lang(s: str) -> str:
+    """Source-language tag for a work item: "de" if it only looks German, else "en"."""
+    is_en, is_de = lang_hints(s)
+    return "de" if is_de and not is_en else "en"
 
-# Simple heuristic to guess if a string looks like German (contains umlauts or common words)
-_DE_HINTS = re.compile(r"\b(der|die|das|und|ist|nicht|für|mit|ein|eine|zu|von|auf|als|auch)\b", re.I)
+def looks_english(s: str) -> bool:
+    """Check if a string looks like English text."""
+    return lang_hints(s)[0]
 
 def looks_german(s: str) -> bool:
-    if not s:
-        return False
-    # presence of German-specific characters or common German words
-    if any(ch in s for ch in ("ä", "ö", "ü", "ß", "Ä", "Ö", "Ü")):
-        return True
-    return bool(_DE_HINTS.search(s))
+    """Check if a string looks like German text."""
+    return lang_hints(s)[1]
+
+# Letters that only (or mostly) occur in a given target language. A msgstr
+# containing them that does not look English or German is treated as
+# already translated. Languages without distinctive letters are absent.
+_TARGET_HINTS: Dict[str, "re.Pattern[str]"] = {
+    # å is shared with Swedish and ä/ö with German, so Swedish has no entry
+    "nb": re.compile(r"[æøÆØ]"),
+    "da": re.compile(r"[æøÆØ]"),
+    "es": re.compile(r"[ñ¿¡Ñ]"),
+    "pl": re.compile(r"[ąćęłńśźżĄĆĘŁŃŚŹŻ]"),
+    "cs": re.compile(r"[ěřůĚŘŮ]"),
+    "sk": re.compile(r"[ľĺŕôĽĹŔÔ]"),
+    "hu": re.compile(r"[őűŐŰ]"),
+    "ro": re.compile(r"[ăâîșțşţĂÂÎȘȚŞŢ]"),
+    "hr": re.compile(r"[čćđšžČĆĐŠŽ]"),
+    "bs": re.compile(r"[čćđšžČĆĐŠŽ]"),
+    "me": re.compile(r"[čćđšžČĆĐŠŽ]"),
+    "sl": re.compile(r"[čšžČŠŽ]"),
+    "sr": re.compile(r"[\u0400-\u04FFčćđšžČĆĐŠŽ]"),
+    "bg": re.compile(r"[\u0400-\u04FF]"),
+    "ru": re.compile(r"[\u0400-\u04FF]"),
+    "el": re.compile(r"[\u0370-\u03FF]"),
+    "ka": re.compile(r"[\u10A0-\u10FF]"),
+}
 
 # ---- Placeholder extraction & validation ----
-_PLACEHOLDER_RE = re.compile(
-    r"(%(?:\d+\$)?[-+0 #]*(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlLqjzt]*[diouxXeEfFgGaAcspn%])"
+_PLACEHOLDER_PATTERN = (
+    r"(?i)(%(?:\d+\$)?[-+0 #]*(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlLqjzt]*[diouxXeEfFgGaAcspn%])"
     r"|(%@)"
     r"|(\{\w*\})"
     r"|(<[^>]+>)"
     r"|(\[\/?[^\]]+\])"
-    r"|(https?://\S+)",
-    re.IGNORECASE,
+    r"|(https?://\S+)"
 )
+_PLACEHOLDER_RE = _compile_linear(_PLACEHOLDER_PATTERN)
+
+@functools.lru_cache(maxsize=4096)
+def _extract_placeholders_cached(text: str) -> Tuple[str, ...]:
+    # UI strings recur within and across catalogs, so most lookups are hits
+    return tuple(m.group() for m in _PLACEHOLDER_RE.finditer(text))
 
 def extract_placeholders(text: str) -> List[str]:
     """Extract all placeholders, HTML tags, and URLs from text."""
-    return [m.group() for m in _PLACEHOLDER_RE.finditer(text)]
+    return list(_extract_placeholders_cached(text))
+
+# A whole string that is a bare URL, e-mail address, number or single placeholder
+_TRIVIAL_RE = re.compile(
+    r"\s*(?:https?://\S+|[\w.+-]+@[\w-]+(?:\.[\w-]+)+|\d+(?:[.,]\d+)?|%(?:\d+\$)?[sd]|\{\w*\})\s*"
+)
+
+# Tokens that carry no translatable words: printf/%(name)s/ICU placeholders,
+# HTML tags and URLs. Bracketed [labels] are left in, they are often words,
+# and so are tags with a user-visible attribute (<img alt="Open file">).
+# Plain re: it is used with sub(), which _compile_linear does not cover.
+_NON_WORD_TOKENS_RE = re.compile(
+    r"(?i)%(?:\d+\$|\([^)]+\))?[-+0 #]*(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlLqjzt]*[diouxXeEfFgGaAcsprn%]"
+    r"|%@"
+    r"|\{[^{}]*\}"
+    r"|<(?![^>]*\s(?:alt|title|placeholder|aria-label)\s*=\s*(?:\"[^\"]*[^\W\d_]|'[^']*[^\W\d_]|[^\W\d_]))[^>]+>"
+    r"|https?://\S+"
+)
+
+def is_trivial(text: str) -> bool:
+    """True if *text* has nothing to translate and can be copied verbatim."""
+    if _TRIVIAL_RE.fullmatch(text):
+        return True
+    # e.g. "%s: %d", "{count} / {total}", "<br/>", "<b>%(name)s</b>"
+    return not any(c.isalpha() for c in _NON_WORD_TOKENS_RE.sub("", text))
 
 def validate_placeholders(source: str, translation: str) -> List[str]:
     """Return list of placeholders present in source but missing in translation."""
-    src_ph = extract_placeholders(source)
+    src_ph = _extract_placeholders_cached(source)
     if not src_ph:
         return []
-    missing = []
-    for ph in src_ph:
-        if ph not in translation:
-            missing.append(ph)
-    return missing
+    # One regex sweep over the translation; the substring check only runs for
+    # tokens it tokenised differently (e.g. a URL followed by punctuation)
+    trans_ph = {m.group() for m in _PLACEHOLDER_RE.finditer(translation)}
+    return [ph for ph in src_ph if ph not in trans_ph and ph not in translation]
 
 # ---- Context loading ----
-def load_context(context_path: Optional[str] = None) -> str:
-    """Load domain context from a file (plain text or JSON)."""
-    if not context_path:
-        return ""
-    p = Path(context_path)
-    if not p.exists():
-        print(f"Warning: Context file not found: {context_path}")
-        return ""
-    text = p.read_text(encoding="utf-8").strip()
+def load_context(context_path: Optional[str] = None, context_text: Optional[str] = None) -> str:
+    """
+    Load domain context (plain text or JSON).
+
+    *context_text* is used as-is when given, so callers that already hold
+    the context need not write it to a file; otherwise *context_path* is read.
+    """
+    if context_text is None:
+        if not context_path:
+            return ""
+        p = Path(context_path)
+        if not p.exists():
+            print(f"Warning: Context file not found: {context_path}")
+            return ""
+        context_text = p.read_text(encoding="utf-8")
+    text = context_text.strip()
     # If it looks like JSON, try to extract just the instructional text
     if text.startswith("{") or text.startswith("["):
         try:
-            data = json.loads(text)
+            data = _json_loads(text)
             if isinstance(data, dict) and "instructions" in data:
                 return data["instructions"]
         except json.JSONDecodeError:
@@ -105,8 +329,16 @@ def load_context(context_path: Optional[str] = None) -> str:
 
 # ---- OpenAI client ----
 try:
-    from openai import OpenAI
-    client = OpenAI()
+    from openai import (
+        OpenAI,
+        AsyncOpenAI,
+        DefaultAsyncHttpxClient,
+        DefaultHttpxClient,
+        APIConnectionError,
+        APITimeoutError,
+        InternalServerError,
+        RateLimitError,
+    )
 except Exception as e:
     raise SystemExit("OpenAI SDK not installed or import failed. Run: pip install openai") from e
 
@@ -142,7 +374,9 @@ def format_glossary_for_prompt(glossary: List[Dict[str, str]]) -> str:
     """Format glossary entries for injection into the system prompt.
 
     Each entry should have 'source' and 'target' keys.
-    Returns an empty string if the glossary is empty.
+    Returns an empty string if the glossary is empty. Entries are sorted so
+    the prompt is byte-identical however the glossary was entered, which
+    keeps OpenAI's prompt cache and the translation cache warm across runs.
     """
     if not glossary:
         return ""
@@ -150,7 +384,7 @@ def format_glossary_for_prompt(glossary: List[Dict[str, str]]) -> str:
         "\n=== GLOSSARY (mandatory) ===",
         "The following terms MUST be translated exactly as shown. Do not paraphrase or transliterate.",
     ]
-    for entry in glossary:
+    for entry in sorted(glossary, key=lambda e: (e.get("source", "").strip().casefold(), e.get("target", ""))):
         src = entry.get("source", "").strip()
         tgt = entry.get("target", "").strip()
         if src and tgt:
@@ -163,8 +397,25 @@ def make_system_prompt(target_lang: str = "nb", domain_context: str = "", glossa
     """
     Build a rich system prompt that tells the model exactly how to behave.
     """
-    lang_map = {code: name for code, name in TARGET_LANGUAGES.items()}
-    target_name = lang_map.get(target_lang, target_lang)
+    parts = [_system_prompt_base(target_lang)]
+
+    # Glossary injection — placed before domain context for higher priority
+    if glossary:
+        parts.append(format_glossary_for_prompt(glossary))
+
+    if domain_context:
+        parts.append("")
+        parts.append("=== DOMAIN CONTEXT ===")
+        parts.append("The content you are translating relates to the following domain. Use this context to choose accurate terminology:")
+        parts.append(domain_context)
+
+    return "\n".join(parts)
+
+
+@functools.lru_cache(maxsize=None)
+def _system_prompt_base(target_lang: str) -> str:
+    """Role, rules and few-shot example: the part of the system prompt fixed per target language."""
+    target_name = TARGET_LANGUAGES.get(target_lang, target_lang)
 
     register_note = _REGISTER_NOTES.get(target_lang, "")
 
@@ -192,20 +443,13 @@ def make_system_prompt(target_lang: str = "nb", domain_context: str = "", glossa
         "8) Do NOT add extra keys, markdown formatting, or commentary.",
     ])
 
-    # Glossary injection — placed before domain context for higher priority
-    if glossary:
-        parts.append(format_glossary_for_prompt(glossary))
-
-    if domain_context:
-        parts.append("")
-        parts.append("=== DOMAIN CONTEXT ===")
-        parts.append("The content you are translating relates to the following domain. Use this context to choose accurate terminology:")
-        parts.append(domain_context)
+    # Few-shot example — static per language, so it belongs to the cached prefix
+    parts.append(_example_block(target_lang))
 
     return "\n".join(parts)
 
 
-# Per-language few-shot examples used in make_user_prompt
+# Per-language few-shot examples used in make_system_prompt
 _FEWSHOT_EXAMPLES: Dict[str, Dict] = {
     "nb": {
         "items": [
@@ -393,13 +637,9 @@ _FEWSHOT_EXAMPLES: Dict[str, Dict] = {
 }
 
 
-def make_user_prompt(pairs: List[Dict[str, str]], target_lang: str = "nb") -> str:
-    """
-    Build the user message containing items to translate, with few-shot examples.
-    """
-    lang_map = {code: name for code, name in TARGET_LANGUAGES.items()}
-    target_name = lang_map.get(target_lang, target_lang)
-
+@functools.lru_cache(maxsize=None)
+def _example_block(target_lang: str) -> str:
+    """Serialised few-shot example for the system prompt; constant per target language."""
     # Provide examples tailored for the requested target language
     fewshot = _FEWSHOT_EXAMPLES.get(target_lang)
     if fewshot:
@@ -414,93 +654,98 @@ def make_user_prompt(pairs: List[Dict[str, str]], target_lang: str = "nb") -> st
         example_items = [{"id": "ex1", "text": "Accept All", "lang": "en"}]
         examples = {"translations": [{"id": "ex1", "translation": "Accept All"}]}
 
-    prompt_parts = [
-        f"Translate the following items into {target_name}.",
+    return "\n".join([
         "",
-        "--- EXAMPLE ---",
+        "=== EXAMPLE ===",
         "Input items:",
-        json.dumps(example_items, ensure_ascii=False),
+        _json_dumps(example_items),
         "Expected output:",
-        json.dumps(examples, ensure_ascii=False),
-        "--- END EXAMPLE ---",
-        "",
-        "Now translate these items:",
-        json.dumps(pairs, ensure_ascii=False),
-    ]
-    return "\n".join(prompt_parts)
+        _json_dumps(examples),
+    ])
+
+def make_user_prompt(pairs: List[Dict[str, str]], target_lang: str = "nb") -> str:
+    """
+    Build the user message: just the items to translate. Rules and the
+    few-shot example live in the system prompt, which is identical for
+    every request of a run and so served from OpenAI's prompt cache.
+    """
+    target_name = TARGET_LANGUAGES.get(target_lang, target_lang)
+    return f"Translate these items into {target_name}:\n{_json_dumps(pairs)}"
+
+# Structured-outputs schema for a batch reply. Strict mode requires an
+# object at the root and every property listed in "required".
+TRANSLATIONS_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "translations",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "translations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "translation": {"type": "string"},
+                        },
+                        "required": ["id", "translation"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["translations"],
+            "additionalProperties": False,
+        },
+    },
+}
 
-@retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=2, max=20))
-def call_model(
+
+def build_request(
     batch: List[Dict[str, str]],
     model: str,
+    system_prompt: str,
     target_lang: str = "nb",
-    domain_context: str = "",
-    glossary: Optional[List[Dict[str, str]]] = None,
-) -> Dict[str, str]:
+) -> Dict[str, Any]:
     """
-    Send a batch to the model and get back a dict id -> translation.
-    Uses JSON mode for reliable structured output. Retries on transient errors.
+    Build the chat.completions request body for one batch.
+
+    Shared by the live path (call_model) and the Batch API JSONL writer so
+    both send exactly the same payload.
     """
-    system_prompt = make_system_prompt(target_lang=target_lang, domain_context=domain_context, glossary=glossary)
     user_prompt = make_user_prompt(batch, target_lang=target_lang)
 
-    # Build request payload — use JSON mode for guaranteed valid JSON
+    # Build request payload — the schema guarantees the reply's shape
     messages: List[Dict[str, str]] = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt},
     ]
-    # Cast for OpenAI SDK type checker compatibility
-    typed_messages: Any = messages
-
-    try:
-        # gpt-5.x models use max_completion_tokens; older models use max_tokens
-        if model.startswith("gpt-5"):
-            resp = client.chat.completions.create(
-                model=model,
-                messages=typed_messages,
-                temperature=0.1,
-                response_format={"type": "json_object"},
-                max_completion_tokens=4096,
-            )
-        else:
-            resp = client.chat.completions.create(
-                model=model,
-                messages=typed_messages,
-                temperature=0.1,
-                response_format={"type": "json_object"},
-                max_tokens=4096,
-            )
-    except Exception:
-        # Let tenacity handle retries for transport-level errors
-        raise
-
-    # With JSON mode the response is always in choices[0].message.content
-    text = None
-    try:
-        text = resp.choices[0].message.content
-    except (AttributeError, IndexError, TypeError):
-        pass
+    body: Dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "temperature": 0.1,
+        "response_format": TRANSLATIONS_RESPONSE_FORMAT,
+    }
+    # Reserve only what this batch can plausibly need, so rate limits that
+    # count the output cap (TPM) leave room for more concurrent requests
+    output_cap = output_token_budget(batch)
+    # gpt-5.x models use max_completion_tokens; older models use max_tokens
+    if model.startswith("gpt-5"):
+        body["max_completion_tokens"] = output_cap
+    else:
+        body["max_tokens"] = output_cap
+    return body
 
-    if not text:
-        with open("raw_responses.log", "a", encoding="utf-8") as f:
-            f.write("--- MISSING TEXT RESPONSE ---\n")
-            f.write(repr(resp))
-            f.write("\n\n")
-        raise TypeError("Model response contained no text/content")
 
-    # Parse JSON — should always be valid thanks to JSON mode
+def parse_translations(text: str) -> Dict[str, str]:
+    """Parse a model response body into a dict id -> translation."""
+    # Structured outputs (and JSON mode before them) always return bare JSON,
+    # so there is no substring recovery; a bad body goes to the retry path
     try:
-        data = json.loads(text)
+        data = _json_loads(text)
     except json.JSONDecodeError:
-        # Fallback: try to extract a JSON substring
-        m = re.search(r"(\{.*\})", text, re.DOTALL)
-        if m:
-            try:
-                data = json.loads(m.group(1))
-            except json.JSONDecodeError:
-                data = None
-        else:
-            data = None
+        data = None
 
     if data is None:
         with open("raw_responses.log", "a", encoding="utf-8") as f:
@@ -510,6 +755,8 @@ def call_model(
         raise TypeError("Failed to parse JSON from model response")
 
     # Normalise: accept {"translations": [...]}, {"items": [...]}, or bare [...]
+    # The schema only produces the first; the rest cover Batch API jobs
+    # submitted in JSON mode by earlier versions
     if isinstance(data, dict):
         if "translations" in data:
             data = data["translations"]
@@ -534,6 +781,258 @@ def call_model(
 
     return result
 
+
+# Only transport-level / rate-limit / server errors are worth retrying; a
+# malformed response or other 4xx fails fast so the caller can bisect the batch.
+_RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+_MAX_ATTEMPTS = 6
+_MAX_RETRY_WAIT = 60.0
+_jittered_backoff = wait_random_exponential(min=1, max=_MAX_RETRY_WAIT)
+
+
+def _retry_wait(retry_state) -> float:
+    """
+    tenacity wait: jittered exponential backoff, but never shorter than the
+    Retry-After the server sent with a 429/503 (capped at _MAX_RETRY_WAIT).
+    """
+    wait = _jittered_backoff(retry_state)
+    response = getattr(retry_state.outcome.exception(), "response", None)
+    if response is None:
+        return wait
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            server_wait = float(headers["retry-after-ms"]) / 1000
+        elif "retry-after" in headers:
+            server_wait = float(headers["retry-after"])
+        else:
+            return wait
+    except ValueError:
+        # HTTP-date form; the jittered backoff is close enough
+        return wait
+    return max(wait, min(server_wait, _MAX_RETRY_WAIT))
+
+
+def _log_retry(retry_state) -> None:
+    """tenacity before_sleep hook: report the retry through the call's log_callback."""
+    log_callback = retry_state.kwargs.get("log_callback")
+    if log_callback is None:
+        return
+    exc = retry_state.outcome.exception()
+    sleep = retry_state.next_action.sleep if retry_state.next_action else 0.0
+    log_callback(
+        f"Retry {retry_state.attempt_number}/{_MAX_ATTEMPTS - 1} after {sleep:.1f}s "
+        f"({exc.__class__.__name__})"
+    )
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests and tokens per minute.
+
+    Both buckets start full and refill continuously; acquire() waits until
+    one request and the request's estimated tokens fit. Used from the single
+    client loop thread, so it needs no locking.
+    """
+
+    def __init__(self, max_requests_per_minute: float = 0, max_tokens_per_minute: float = 0):
+        # 0 disables the corresponding limit
+        self.max_requests = float(max_requests_per_minute or 0)
+        self.max_tokens = float(max_tokens_per_minute or 0)
+        self._requests = self.max_requests
+        self._tokens = self.max_tokens
+        self._last = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        self._requests = min(self.max_requests, self._requests + elapsed * self.max_requests / 60.0)
+        self._tokens = min(self.max_tokens, self._tokens + elapsed * self.max_tokens / 60.0)
+
+    async def acquire(self, tokens: int) -> None:
+        # A request larger than the whole bucket waits for a full bucket
+        if self.max_tokens:
+            tokens = min(tokens, int(self.max_tokens))
+        while True:
+            self._refill()
+            requests_ok = not self.max_requests or self._requests >= 1
+            tokens_ok = not self.max_tokens or self._tokens >= tokens
+            if requests_ok and tokens_ok:
+                if self.max_requests:
+                    self._requests -= 1
+                if self.max_tokens:
+                    self._tokens -= tokens
+                return
+            await asyncio.sleep(0.05)
+
+
+class ConcurrencyLimiter:
+    """
+    Cap on in-flight API calls that backs off when the API pushes back.
+
+    Works like a semaphore of *limit* slots (use ``async with``). backoff()
+    halves the cap for *cooldown* seconds; afterwards each finished call
+    raises it by one until it is back at *limit* (AIMD). Waiters sleep on an
+    asyncio.Condition and are woken in arrival order when a slot frees. Like
+    RateLimiter it is used on the client loop thread, but it may be built on
+    any thread: the Condition is created on first use, since before Python
+    3.10 it binds to the current thread's event loop when constructed.
+    """
+
+    def __init__(self, limit: int, cooldown: float = 60.0):
+        self.max_limit = max(1, int(limit))
+        self.limit = self.max_limit
+        self.cooldown = cooldown
+        self._in_flight = 0
+        self._reduced_until = 0.0
+        self._slot_freed: Optional[asyncio.Condition] = None
+
+    async def __aenter__(self) -> "ConcurrencyLimiter":
+        if self._slot_freed is None:
+            self._slot_freed = asyncio.Condition()
+        async with self._slot_freed:
+            await self._slot_freed.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._slot_freed:
+            self._in_flight -= 1
+            freed = 1
+            if self.limit < self.max_limit and time.monotonic() >= self._reduced_until:
+                self.limit += 1
+                freed += 1
+            self._slot_freed.notify(freed)
+
+    def backoff(self) -> None:
+        self.limit = max(1, self.limit // 2)
+        self._reduced_until = time.monotonic() + self.cooldown
+
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """Rough token cost of a request as OpenAI counts it: prompt + output cap."""
+    prompt_chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+    output_cap = request.get("max_completion_tokens") or request.get("max_tokens") or 0
+    return prompt_chars // 4 + output_cap
+
+
+def record_usage(totals: Optional[Dict[str, int]], usage) -> None:
+    """Add a response's prompt and cached-prompt token counts to *totals*."""
+    if totals is None or usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    totals["prompt_tokens"] = totals.get("prompt_tokens", 0) + (getattr(usage, "prompt_tokens", 0) or 0)
+    totals["cached_tokens"] = totals.get("cached_tokens", 0) + (getattr(details, "cached_tokens", 0) or 0)
+
+
+@retry(
+    stop=stop_after_attempt(_MAX_ATTEMPTS),
+    wait=_retry_wait,
+    retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+async def call_model(
+    aclient: "AsyncOpenAI",
+    batch: List[Dict[str, str]],
+    model: str,
+    system_prompt: str,
+    target_lang: str = "nb",
+    log_callback=None,
+    usage_totals: Optional[Dict[str, int]] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> Dict[str, str]:
+    """
+    Send a batch to the model and get back a dict id -> translation.
+    Uses structured outputs for a guaranteed JSON shape. Rate-limit, timeout,
+    connection and 5xx errors are retried with jittered exponential backoff
+    that honours Retry-After; other errors raise at once. Each retry is
+    reported through *log_callback* (pass it by keyword).
+
+    *system_prompt* is built once per run by the caller (see make_system_prompt)
+    so every request in the run shares the same messages[0] and the prefix
+    can be served from OpenAI's prompt cache. Token usage is added to
+    *usage_totals* when given (see record_usage). With *rate_limiter*, every
+    attempt first waits for request and token capacity.
+    """
+    # Cast for OpenAI SDK type checker compatibility
+    request: Any = build_request(batch, model, system_prompt, target_lang=target_lang)
+
+    if rate_limiter is not None:
+        await rate_limiter.acquire(estimate_request_tokens(request))
+    resp = await aclient.chat.completions.create(**request)
+    record_usage(usage_totals, getattr(resp, "usage", None))
+
+    # With JSON mode the response is always in choices[0].message.content
+    text = None
+    try:
+        text = resp.choices[0].message.content
+    except (AttributeError, IndexError, TypeError):
+        pass
+
+    if not text:
+        with open("raw_responses.log", "a", encoding="utf-8") as f:
+            f.write("--- MISSING TEXT RESPONSE ---\n")
+            f.write(repr(resp))
+            f.write("\n\n")
+        raise TypeError("Model response contained no text/content")
+
+    return parse_translations(text)
+
+# ---- Token-aware batching ----
+_MAX_OUTPUT_TOKENS = 4096
+_ITEM_JSON_OVERHEAD_TOKENS = 15  # {"id": "…", "translation": "…"} framing per item
+DEFAULT_BATCH_TOKENS = 3000  # source + expected translation per batch (pack_batches)
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Cheap token estimate for one source string (≈3 chars per token)."""
+    return len(text) // 3 + 1
+
+
+def output_token_budget(batch: List[Dict[str, str]]) -> int:
+    """Output cap for a batch: twice the expected reply plus slack, at most 4096."""
+    expected = sum(estimate_text_tokens(item["text"]) + _ITEM_JSON_OVERHEAD_TOKENS for item in batch)
+    return min(_MAX_OUTPUT_TOKENS, expected * 2 + 256)
+
+
+def pack_batches(
+    items: List[Dict[str, str]],
+    max_items: int = 50,
+    max_tokens: int = DEFAULT_BATCH_TOKENS,
+) -> List[List[Dict[str, str]]]:
+    """
+    Greedily pack items into batches of at most *max_items* whose source plus
+    expected translation stays within *max_tokens*.
+
+    Short UI labels fill whole batches; long paragraphs get smaller ones so
+    the reply can't outgrow the output cap. An item over the budget on its
+    own is sent alone. Deterministic for a given input order.
+    """
+    batches: List[List[Dict[str, str]]] = []
+    current: List[Dict[str, str]] = []
+    current_tokens = 0
+    for item in items:
+        # Source tokens in, roughly as many out
+        cost = (estimate_text_tokens(item["text"]) + _ITEM_JSON_OVERHEAD_TOKENS) * 2
+        if current and (len(current) >= max_items or current_tokens + cost > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _batch_tokens(max_batch_tokens: Optional[int]) -> int:
+    """Resolve a max_batch_tokens argument; None reads MAX_BATCH_TOKENS."""
+    if max_batch_tokens is None:
+        return get_defaults()["max_batch_tokens"]
+    return max_batch_tokens
+
+
 def chunked(lst, n):
     """Yield successive n-sized chunks from lst."""
     for i in range(0, len(lst), n):
@@ -582,6 +1081,9 @@ TARGET_LANGUAGES = {
     "me": "Montenegrin",
 }
 
+# Case-insensitive lookup of supported codes, used by _normalise_lang
+_TARGET_BY_LOWER = {code.lower(): code for code in TARGET_LANGUAGES}
+
 SOURCE_LANGUAGES = ["auto", "en", "de"]
 
 # Map common aliases to our canonical language codes
@@ -634,9 +1136,8 @@ def _normalise_lang(code: str) -> str:
         return alias_hit
 
     # Preserve exact supported locale codes (case-insensitive)
-    canonical_by_lower = {k.lower(): k for k in TARGET_LANGUAGES.keys()}
-    if raw_lower in canonical_by_lower:
-        return canonical_by_lower[raw_lower]
+    if raw_lower in _TARGET_BY_LOWER:
+        return _TARGET_BY_LOWER[raw_lower]
 
     # Fallback to base language for unknown locale forms: cs_CZ -> cs, etc.
     base = raw_lower.split("_")[0]
@@ -653,6 +1154,10 @@ def get_defaults() -> Dict:
     model = os.getenv("DEFAULT_MODEL", "gpt-4.1")
     batch = os.getenv("BATCH_SIZE", "20")
     context = os.getenv("DEFAULT_CONTEXT_FILE", "")
+    concurrency = os.getenv("MAX_CONCURRENCY", "8")
+    rpm = os.getenv("MAX_REQUESTS_PER_MINUTE", "0")
+    tpm = os.getenv("MAX_TOKENS_PER_MINUTE", "0")
+    batch_tokens = os.getenv("MAX_BATCH_TOKENS", str(DEFAULT_BATCH_TOKENS))
 
     target = _normalise_lang(raw_target)
     source = raw_source.lower().strip() if raw_source in SOURCE_LANGUAGES else "auto"
@@ -664,77 +1169,370 @@ def get_defaults() -> Dict:
     except ValueError:
         batch_int = 20
 
+    try:
+        concurrency_int = max(1, int(concurrency))
+    except ValueError:
+        concurrency_int = 8
+
+    try:
+        rpm_int = max(0, int(rpm or 0))
+    except ValueError:
+        rpm_int = 0
+    try:
+        tpm_int = max(0, int(tpm or 0))
+    except ValueError:
+        tpm_int = 0
+    try:
+        batch_tokens_int = max(100, int(batch_tokens))
+    except ValueError:
+        batch_tokens_int = DEFAULT_BATCH_TOKENS
+
     return {
         "model": model if model in AVAILABLE_MODELS else "gpt-4.1",
         "target_lang": target,
         "source_lang": source,
         "batch_size": batch_int,
         "context_file": context or None,
+        "max_concurrency": concurrency_int,
+        "max_requests_per_minute": rpm_int,
+        "max_tokens_per_minute": tpm_int,
+        "max_batch_tokens": batch_tokens_int,
     }
 
 
-def build_work_items(po, source_lang: str = "auto", force: bool = False):
+def classify_entry(
+    msgid: str,
+    msgstr: str,
+    source_lang: str = "auto",
+    force: bool = False,
+    target_hint: Optional["re.Pattern"] = None,
+) -> Optional[Tuple[str, str, str]]:
+    """
+    Decide what to translate for one PO entry.
+
+    Returns (text, source_field, lang) — source_field is "msgid" or "msgstr",
+    lang is "en" or "de" — or None when the entry should be left alone.
+    *target_hint* is the _TARGET_HINTS pattern of the target language; an
+    msgstr matching it (and no English/German hints) counts as translated.
+    """
+    # (is_en, is_de) for each field, computed at most once per entry
+    str_hints = lang_hints(msgstr) if msgstr else (False, False)
+    id_hints = None
+
+    if target_hint and msgstr and not any(str_hints) and target_hint.search(msgstr):
+        return None  # already translated
+
+    if force:
+        source_field = "msgstr" if msgstr else "msgid"
+    elif source_lang == "de":
+        source_field = "msgid"
+    elif str_hints[0]:
+        source_field = "msgstr"
+    else:
+        id_hints = lang_hints(msgid)
+        if source_lang == "en":
+            if not id_hints[0]:
+                return None
+            source_field = "msgid"
+        else:  # auto
+            source_field = "msgid" if id_hints[1] or not msgstr else "msgstr"
+
+    if source_field == "msgstr":
+        text, (is_en, is_de) = msgstr, str_hints
+    else:
+        text, (is_en, is_de) = msgid, id_hints or lang_hints(msgid)
+    if not text:
+        return None
+    return text, source_field, "de" if is_de and not is_en else "en"
+
+
+def build_work_items(po, source_lang: str = "auto", force: bool = False, target_lang: Optional[str] = None):
     """
     Scan a polib PO object and return (work_items, id_map, total_entries).
 
+    Each entry is classified by classify_entry(). Without *force*, entries
+    whose msgstr already looks like *target_lang* (see _TARGET_HINTS) are
+    left alone.
+
     work_items: list of {"id": str, "text": str, "lang": str}
     id_map:     dict  tmp_id -> (entry, source_field)
-    total_entries: int  total non-header entries scanned
+    total_entries: int  total entries scanned (header and obsolete entries excluded)
     """
     work_items = []
     id_map = {}
-    id_counter = 0
     total_entries = 0
+    target_hint = None
+    if target_lang and not force:
+        target_hint = _TARGET_HINTS.get(_normalise_lang(target_lang).split("_")[0])
 
     for entry in po:
-        if entry.msgid == "":
+        msgid = entry.msgid
+        # Header, and #~ entries that gettext keeps only for history
+        if not msgid or entry.obsolete:
             continue
         total_entries += 1
 
-        text_to_translate = None
-        source_field = None
+        picked = classify_entry(msgid, entry.msgstr, source_lang, force, target_hint)
+        if picked is None:
+            continue
+        text, source_field, lang = picked
+        tmp_id = str(len(work_items) + 1)
+        work_items.append({"id": tmp_id, "text": text, "lang": lang})
+        id_map[tmp_id] = (entry, source_field)
 
-        if force:
-            if entry.msgstr:
-                text_to_translate = entry.msgstr
-                source_field = "msgstr"
-            else:
-                text_to_translate = entry.msgid
-                source_field = "msgid"
+    return work_items, id_map, total_entries
+
+
+# ---- Shared event loop for async clients ----
+# An AsyncOpenAI client's connection pool is bound to the event loop it was
+# first used on, so reusable clients need one loop that outlives each run.
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_client_loop_lock = threading.Lock()
+
+
+def get_client_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop (on a daemon thread) used for API calls."""
+    global _client_loop
+    with _client_loop_lock:
+        if _client_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="openai-client-loop", daemon=True).start()
+            _client_loop = loop
+        return _client_loop
+
+
+def run_on_client_loop(coro, events: Optional["queue.Queue"] = None):
+    """
+    Run *coro* on the shared client loop and block until it finishes.
+
+    While waiting, ``(callback, args)`` pairs put on *events* are invoked on
+    the calling thread, so UI callbacks never run on the loop thread.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_client_loop())
+    try:
+        while events is not None:
+            try:
+                fn, args = events.get(timeout=0.05)
+            except queue.Empty:
+                if future.done():
+                    break
+                continue
+            fn(*args)
+        return future.result()
+    except BaseException:
+        # e.g. Streamlit stopping the script mid-run — don't leave the batches running
+        future.cancel()
+        raise
+
+
+# httpx negotiates HTTP/2 only when the optional h2 package is installed
+# (pip install "httpx[http2]"); concurrent requests then share a few TLS sessions.
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+def _async_http_client(max_connections: int, **kwargs) -> httpx.AsyncClient:
+    """httpx client for AsyncOpenAI: SDK defaults, sized pool, HTTP/2 when available."""
+    return DefaultAsyncHttpxClient(
+        http2=_HTTP2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        **kwargs,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _batch_api_client(api_key: Optional[str], base_url: Optional[str]) -> "OpenAI":
+    # One per key/endpoint, so repeated submits and collect polls reuse a
+    # kept-alive connection instead of opening a new TLS session each time.
+    # Unbounded: an evicted client would leak its pool, and there are only
+    # as many entries as keys a process ever sees
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=DefaultHttpxClient(
+            http2=_HTTP2,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        ),
+    )
+
+
+def get_batch_api_client() -> "OpenAI":
+    """Pooled sync client for Batch API calls, for the current OPENAI_API_KEY / OPENAI_BASE_URL."""
+    return _batch_api_client(os.getenv("OPENAI_API_KEY"), os.getenv("OPENAI_BASE_URL"))
+
+
+def make_async_client(api_key: Optional[str] = None, max_connections: int = 100) -> "AsyncOpenAI":
+    """
+    Build an AsyncOpenAI client with a pooled HTTP transport for reuse
+    across translate_po_file() calls. It is closed at interpreter exit.
+
+    *max_connections* should be at least the max_concurrency used with the
+    client; every connection is kept alive so a full run reuses them.
+    """
+    aclient = AsyncOpenAI(
+        api_key=api_key,
+        max_retries=0,  # retries are handled by call_model()
+        http_client=_async_http_client(max_connections, timeout=httpx.Timeout(60.0, connect=10.0)),
+    )
+    atexit.register(_close_async_client, aclient)
+    return aclient
+
+
+def _close_async_client(aclient: "AsyncOpenAI") -> None:
+    loop = _client_loop
+    if loop is None or loop.is_closed():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(aclient.close(), loop).result(timeout=5)
+    except Exception:
+        pass
+
+
+def copy_trivial_items(work_items: List[Dict[str, str]], id_map: Dict):
+    """
+    Copy items with nothing to translate (see is_trivial) straight to msgstr.
+
+    Returns (remaining_items, copied_count); only the remaining items need
+    to go to the model.
+    """
+    remaining = []
+    copied = 0
+    for item in work_items:
+        if is_trivial(item["text"]):
+            entry_obj, _src = id_map[item["id"]]
+            entry_obj.msgstr = item["text"]
+            copied += 1
         else:
-            if source_lang == "en":
-                if entry.msgstr and looks_english(entry.msgstr):
-                    text_to_translate = entry.msgstr
-                    source_field = "msgstr"
-                elif looks_english(entry.msgid):
-                    text_to_translate = entry.msgid
-                    source_field = "msgid"
-            elif source_lang == "de":
-                text_to_translate = entry.msgid
-                source_field = "msgid"
-            else:  # auto
-                if entry.msgstr and looks_english(entry.msgstr):
-                    text_to_translate = entry.msgstr
-                    source_field = "msgstr"
-                elif looks_german(entry.msgid):
-                    text_to_translate = entry.msgid
-                    source_field = "msgid"
-                else:
-                    if entry.msgstr:
-                        text_to_translate = entry.msgstr
-                        source_field = "msgstr"
-                    else:
-                        text_to_translate = entry.msgid
-                        source_field = "msgid"
-
-        if text_to_translate:
-            id_counter += 1
-            tmp_id = f"{id_counter}"
-            detected_lang = "de" if looks_german(text_to_translate) and not looks_english(text_to_translate) else "en"
-            work_items.append({"id": tmp_id, "text": text_to_translate, "lang": detected_lang})
-            id_map[tmp_id] = (entry, source_field)
+            remaining.append(item)
+    return remaining, copied
 
-    return work_items, id_map, total_entries
+
+def dedupe_work_items(work_items: List[Dict[str, str]], key: str = "text"):
+    """
+    Collapse work items that share the same source text (the *key* field).
+
+    Returns (unique_items, fanout) where fanout maps each kept item's id to
+    the ids of every item with that text (itself included), in file order.
+    """
+    unique_items: List[Dict[str, str]] = []
+    fanout: Dict[str, List[str]] = {}
+    first_id_by_text: Dict[str, str] = {}
+    for item in work_items:
+        first_id = first_id_by_text.get(item[key])
+        if first_id is None:
+            first_id_by_text[item[key]] = item["id"]
+            fanout[item["id"]] = [item["id"]]
+            unique_items.append(item)
+        else:
+            fanout[first_id].append(item["id"])
+    return unique_items, fanout
+
+
+def items_to_send(work_items: List[Dict[str, str]]):
+    """
+    The work items a run actually sends to the API, in the order they are
+    packed into batches: trivial entries dropped (copied verbatim instead),
+    duplicates collapsed, shortest text first. Every run and pre-flight
+    estimate packs this list, so they agree on the batches.
+
+    Returns (unique_items, fanout) as dedupe_work_items() does. Does not
+    touch the PO entries.
+    """
+    unique_items, fanout = dedupe_work_items([it for it in work_items if not is_trivial(it["text"])])
+    # Batch similar lengths together so one long paragraph doesn't set the
+    # latency of a batch of short labels; results are applied by id
+    unique_items.sort(key=lambda item: len(item["text"]))
+    return unique_items, fanout
+
+
+def apply_translations(
+    translations: Dict[str, str],
+    batch: List[Dict[str, str]],
+    id_map: Dict,
+    placeholder_warnings: List[Dict],
+    fanout: Optional[Dict[str, List[str]]] = None,
+) -> int:
+    """
+    Write a batch's translations onto their PO entries.
+
+    With *fanout* (from dedupe_work_items) each translation is also written
+    to every entry sharing the source text. Missing placeholders are
+    appended to *placeholder_warnings*. Returns the number of entries updated.
+    """
+    applied = 0
+    batch_by_id = {it["id"]: it["text"] for it in batch}
+    for tid, trans in translations.items():
+        if trans is None:
+            continue
+        orig_text = batch_by_id.get(tid, "")
+        missing_ph = validate_placeholders(orig_text, trans)
+        if missing_ph:
+            placeholder_warnings.append({
+                "id": tid, "source": orig_text,
+                "translation": trans, "missing": missing_ph,
+            })
+        for target_id in (fanout or {}).get(tid, [tid]):
+            entry_obj, _src = id_map[target_id]
+            entry_obj.msgstr = trans
+            applied += 1
+    return applied
+
+
+def _iter_po_text(po: "polib.POFile", lock: Optional[threading.Lock] = None):
+    """
+    Yield the text of po.save() piece by piece: header and metadata, then
+    each entry, obsolete ones last.
+
+    polib renders the whole catalog into one string before writing; for a
+    large file that string (plus the list it is joined from) is the peak of
+    a run's memory, so entries are written as they are rendered instead.
+    *lock*, if given, is held while each entry is rendered.
+    """
+    # An empty file with the same header renders exactly the header + metadata
+    head = polib.POFile(wrapwidth=po.wrapwidth, encoding=po.encoding)
+    head.header = po.header
+    head.metadata = po.metadata
+    head.metadata_is_fuzzy = po.metadata_is_fuzzy
+    yield str(head)
+    for obsolete in (False, True):
+        for entry in po:
+            if bool(entry.obsolete) == obsolete:
+                with lock or contextlib.nullcontext():
+                    text = entry.__unicode__(po.wrapwidth)
+                yield "\n" + text
+
+
+def save_po_atomic(
+    po: "polib.POFile", output_path: str, lock: Optional[threading.Lock] = None
+) -> None:
+    """
+    Save *po* via a temporary file in the same directory and rename it into place.
+
+    An interrupted run (Ctrl-C, crash, full disk) never leaves a truncated
+    .po file behind: *output_path* holds either the old or the new contents.
+    The output is identical to po.save(), written entry by entry; *lock* is
+    held while each entry is rendered, so another thread can keep updating
+    entries under the same lock.
+    """
+    out_path = Path(output_path)
+    # Same directory so os.replace() is a rename, not a cross-device copy
+    tmp_path = out_path.with_name(f".{out_path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding=po.encoding) as f:
+            f.writelines(_iter_po_text(po, lock))
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Seconds between progress saves of the output file during translate_po_file()
+CHECKPOINT_INTERVAL = 10.0
 
 
 def translate_po_file(
@@ -747,20 +1545,48 @@ def translate_po_file(
     source_lang: str = "auto",
     force: bool = False,
     context_file: Optional[str] = None,
+    context_text: Optional[str] = None,
     glossary: Optional[List[Dict[str, str]]] = None,
+    max_concurrency: int = 8,
+    aclient: Optional["AsyncOpenAI"] = None,
+    cache=None,
+    max_requests_per_minute: Optional[int] = None,
+    max_tokens_per_minute: Optional[int] = None,
+    max_batch_tokens: Optional[int] = None,
+    checkpoint_interval: float = CHECKPOINT_INTERVAL,
     progress_callback=None,
     log_callback=None,
 ) -> Dict:
     """
     Core translation function usable by both CLI and GUI.
 
+    Batches are sent concurrently through AsyncOpenAI, with at most
+    ``max_concurrency`` requests in flight at a time. Pass a client from
+    make_async_client() as *aclient* to reuse its connection pool across
+    calls; otherwise a client is created for this run and closed afterwards.
+
     Args:
+        context_text:      domain context as a string; takes precedence over context_file.
+        cache:             optional src.translation_cache.TranslationCache; entries
+                           translated before with the same model and prompt are
+                           reused and new translations are stored in it.
+        max_requests_per_minute / max_tokens_per_minute:
+                           client-side rate limits (see RateLimiter); None reads
+                           MAX_REQUESTS_PER_MINUTE / MAX_TOKENS_PER_MINUTE, 0 disables.
+        max_batch_tokens:  token budget per request (source + expected translation);
+                           batches close at this or at batch_size items, whichever
+                           comes first. None reads MAX_BATCH_TOKENS.
+        checkpoint_interval: seconds between saves of the partly translated file to
+                           *output_path* while batches run, so an interrupted run
+                           keeps its work; 0 saves only at the end.
         progress_callback: callable(translated_so_far, total) — called after each batch.
         log_callback:      callable(message) — called for status messages.
+        Both callbacks are invoked on the calling thread.
 
     Returns a dict with summary info:
         {"translated": int, "total_entries": int, "total_to_translate": int,
-         "placeholder_warnings": list, "failed": list}
+         "placeholder_warnings": list, "failed": list, "output_path": str,
+         "usage": {"prompt_tokens": int, "cached_tokens": int}}
     """
     def _log(msg):
         if log_callback:
@@ -769,69 +1595,397 @@ def translate_po_file(
     if not os.getenv("OPENAI_API_KEY"):
         raise RuntimeError("Please set OPENAI_API_KEY environment variable")
 
-    domain_context = load_context(context_file)
+    domain_context = load_context(context_file, context_text)
     if domain_context:
         _log(f"Loaded domain context ({len(domain_context)} chars)")
 
-    _log(f"Model: {model} | Batch size: {batch_size} | Target: {target_lang}")
+    _log(f"Model: {model} | Batch size: {batch_size} | Concurrency: {max_concurrency} | Target: {target_lang}")
 
     try:
         po = polib.pofile(input_path, encoding="utf-8")
     except Exception as e:
         raise RuntimeError(f"Failed to load PO file: {e}")
 
-    work_items, id_map, total_entries = build_work_items(po, source_lang=source_lang, force=force)
+    work_items, id_map, total_entries = build_work_items(
+        po, source_lang=source_lang, force=force, target_lang=target_lang,
+    )
     total_to_translate = len(work_items)
     _log(f"Entries in file: {total_entries} | To translate: {total_to_translate}")
 
-    translated_count = 0
+    # URLs, numbers and bare placeholders are copied through without a call
+    work_items, trivial_count = copy_trivial_items(work_items, id_map)
+    if trivial_count:
+        _log(f"Copied {trivial_count} entries with no translatable text verbatim")
+
+    # Translate each distinct source text once and copy it to its duplicates
+    unique_items, fanout = items_to_send(work_items)
+    if len(unique_items) < len(work_items):
+        # Compare packed batch counts; token budgets make ceil(n / batch_size) wrong
+        budget = _batch_tokens(max_batch_tokens)
+        calls_saved = (
+            len(pack_batches(sorted(work_items, key=lambda item: len(item["text"])), max_items=batch_size, max_tokens=budget))
+            - len(pack_batches(unique_items, max_items=batch_size, max_tokens=budget))
+        )
+        _log(f"{len(unique_items)} unique of {len(work_items)} entries — saved {calls_saved} API call(s)")
+
+    translated_count = trivial_count
     placeholder_warnings = []
     failed_items = []
+    usage_totals = {"prompt_tokens": 0, "cached_tokens": 0}
+
+    # Identical for every batch in the run — build it once
+    system_prompt = make_system_prompt(target_lang=target_lang, domain_context=domain_context, glossary=glossary)
+
+    # Reuse translations from earlier runs with the same model and prompt
+    cache_keys: Dict[str, str] = {}
+    if cache is not None and unique_items:
+        cache_keys = {item["id"]: cache.make_key(model, system_prompt, item) for item in unique_items}
+        cached = cache.get_many(list(cache_keys.values()))
+        misses = []
+        for item in unique_items:
+            hit = cached.get(cache_keys[item["id"]])
+            if hit is None:
+                misses.append(item)
+            else:
+                translated_count += apply_translations({item["id"]: hit}, [item], id_map, placeholder_warnings, fanout)
+        if len(misses) < len(unique_items):
+            _log(f"Translation cache: {len(unique_items) - len(misses)} hit(s), {len(misses)} to translate")
+        unique_items = misses
+
+    def _remember(translations: Dict[str, str], batch: List[Dict[str, str]]) -> None:
+        # Only translations that kept their placeholders are worth reusing
+        cache.set_many(
+            (cache_keys[item["id"]], translations[item["id"]])
+            for item in batch
+            if translations.get(item["id"]) is not None
+            and not validate_placeholders(item["text"], translations[item["id"]])
+        )
+
+    # batch_size caps items per request; long strings get smaller batches
+    batches = pack_batches(unique_items, max_items=batch_size, max_tokens=_batch_tokens(max_batch_tokens))
+
+    # Pace requests below the account's limits instead of running into 429s
+    if max_requests_per_minute is None or max_tokens_per_minute is None:
+        defaults = get_defaults()
+        if max_requests_per_minute is None:
+            max_requests_per_minute = defaults["max_requests_per_minute"]
+        if max_tokens_per_minute is None:
+            max_tokens_per_minute = defaults["max_tokens_per_minute"]
+    rate_limiter = None
+    if max_requests_per_minute or max_tokens_per_minute:
+        rate_limiter = RateLimiter(max_requests_per_minute, max_tokens_per_minute)
+        _log(f"Rate limit: {max_requests_per_minute or '∞'} requests/min, {max_tokens_per_minute or '∞'} tokens/min")
+
+    # Batches run on the shared client loop; callbacks are queued and
+    # invoked back on this thread by run_on_client_loop().
+    events: "queue.Queue" = queue.Queue()
+
+    def _emit_log(msg):
+        if log_callback:
+            events.put((log_callback, (msg,)))
 
-    for batch in chunked(work_items, batch_size):
+    async def _translate_part(aclient: AsyncOpenAI, batch: List[Dict[str, str]]) -> None:
+        nonlocal translated_count
         try:
-            translations = call_model(batch, model, target_lang=target_lang, domain_context=domain_context, glossary=glossary)
-            for tid, trans in translations.items():
-                if trans is None:
-                    continue
-                entry_obj, _src = id_map[tid]
-                orig_text = next((it["text"] for it in batch if it["id"] == tid), "")
-                missing_ph = validate_placeholders(orig_text, trans)
-                if missing_ph:
-                    placeholder_warnings.append({
-                        "id": tid, "source": orig_text,
-                        "translation": trans, "missing": missing_ph,
-                    })
-                entry_obj.msgstr = trans
-                translated_count += 1
+            async with limiter:
+                translations = await call_model(
+                    aclient, batch, model, system_prompt, target_lang=target_lang,
+                    log_callback=_emit_log, usage_totals=usage_totals, rate_limiter=rate_limiter,
+                )
         except Exception as e:
-            _log(f"Batch failed ({e}), retrying individually…")
-            for item in batch:
-                try:
-                    single_trans = call_model([item], model, target_lang=target_lang, domain_context=domain_context, glossary=glossary)
-                    for tid, trans in single_trans.items():
-                        if trans is None:
-                            continue
-                        entry_obj, _src = id_map[tid]
-                        missing_ph = validate_placeholders(item["text"], trans)
-                        if missing_ph:
-                            placeholder_warnings.append({
-                                "id": tid, "source": item["text"],
-                                "translation": trans, "missing": missing_ph,
-                            })
-                        entry_obj.msgstr = trans
-                        translated_count += 1
-                except Exception as single_e:
-                    failed_items.append({
-                        "id": item.get("id"), "text": item.get("text"),
-                        "error": str(single_e),
-                    })
-
+            if isinstance(e, RateLimitError):
+                limiter.backoff()
+                _emit_log(f"Rate limited; concurrency reduced to {limiter.limit}")
+            if len(batch) == 1:
+                failed_items.extend(
+                    {"id": dup_id, "text": batch[0].get("text"), "error": str(e)}
+                    for dup_id in fanout[batch[0]["id"]]
+                )
+                return
+            # Bisect: a bad item or a transient failure rarely sinks both
+            # halves, so this recovers in O(log n) calls instead of n singles.
+            # The slot is released first, so the halves share the limiter
+            _emit_log(f"Batch of {len(batch)} failed ({e}), retrying in halves…")
+            mid = len(batch) // 2
+            await asyncio.gather(_translate_part(aclient, batch[:mid]), _translate_part(aclient, batch[mid:]))
+            return
+
+        # Only the model call is retried; the results are applied exactly once
+        with po_lock:
+            translated_count += apply_translations(translations, batch, id_map, placeholder_warnings, fanout)
+        if cache is not None:
+            try:
+                # The SQLite commit runs off the loop so it doesn't stall other requests
+                await asyncio.get_running_loop().run_in_executor(None, _remember, translations, batch)
+            except Exception as e:
+                _emit_log(f"Warning: could not save {len(batch)} translation(s) to the cache: {e}")
+
+    # Progress saves. A single worker thread streams po to disk, so renders
+    # never run on the loop and never overlap. It holds po_lock for one entry
+    # at a time and the loop holds it while applying a batch, so no entry is
+    # rendered half-updated. A save still queued when the next is due is
+    # dropped; the newer one covers it.
+    po_lock = threading.Lock()
+    checkpoints = ThreadPoolExecutor(max_workers=1)
+    pending_checkpoint: Optional[Future] = None
+    last_checkpoint = time.monotonic()
+
+    def _checkpoint() -> None:
+        nonlocal pending_checkpoint, last_checkpoint
+        if not checkpoint_interval or time.monotonic() - last_checkpoint < checkpoint_interval:
+            return
+        last_checkpoint = time.monotonic()
+        if pending_checkpoint is not None:
+            pending_checkpoint.cancel()
+        pending_checkpoint = checkpoints.submit(save_po_atomic, po, output_path, po_lock)
+
+    async def _translate_batch(aclient: AsyncOpenAI, batch: List[Dict[str, str]]) -> None:
+        await _translate_part(aclient, batch)
+        _checkpoint()
+
+        # Reported as each batch completes, in completion order
         if progress_callback:
-            progress_callback(translated_count, total_to_translate)
+            events.put((progress_callback, (translated_count, total_to_translate)))
+
+    limiter = ConcurrencyLimiter(max_concurrency)
+
+    async def _translate_all() -> None:
+        if aclient is not None:
+            await asyncio.gather(*(_translate_batch(aclient, b) for b in batches))
+            return
+
+        # Retries are handled by call_model() so they can be logged and jittered
+        async with AsyncOpenAI(max_retries=0, http_client=_async_http_client(max_concurrency)) as run_client:
+            await asyncio.gather(*(_translate_batch(run_client, b) for b in batches))
+
+    try:
+        run_on_client_loop(_translate_all(), events)
+    finally:
+        # Let the last progress save land (also on Ctrl-C) before the final one
+        checkpoints.shutdown(wait=True)
+
+    if usage_totals["prompt_tokens"]:
+        _log(
+            f"Prompt tokens: {usage_totals['prompt_tokens']:,} "
+            f"({usage_totals['cached_tokens']:,} served from prompt cache)"
+        )
 
     # Save
-    po.save(output_path)
+    save_po_atomic(po, output_path)
+
+    return {
+        "translated": translated_count,
+        "total_entries": total_entries,
+        "total_to_translate": total_to_translate,
+        "placeholder_warnings": placeholder_warnings,
+        "failed": failed_items,
+        "output_path": output_path,
+        "usage": usage_totals,
+    }
+
+
+# ---- OpenAI Batch API (half price, results within 24h) ----
+_BATCH_TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+# The CLI waits out the whole 24h completion window, plus time to finalise
+_BATCH_API_MAX_WAIT = 25 * 3600.0
+# custom_id of each request: batch-<n>-<fingerprint of the batch's items>
+_CUSTOM_ID_RE = re.compile(r"batch-(\d+)(?:-([0-9a-f]+))?")
+
+
+def _batch_fingerprint(batch: List[Dict[str, str]]) -> str:
+    """Short hash of a batch's ids and texts, to tie Batch API results to their items."""
+    digest = hashlib.sha256()
+    for item in batch:
+        digest.update(f"{item['id']}\x1e{item['text']}\x1f".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _job_fingerprint(fingerprints: List[str]) -> str:
+    """Hash over all batch fingerprints, stored in the job's metadata at submit time."""
+    return hashlib.sha256(",".join(fingerprints).encode("ascii")).hexdigest()[:32]
+
+
+def submit_po_batch_job(
+    input_path: str,
+    *,
+    model: str = "gpt-4.1",
+    batch_size: int = 20,
+    target_lang: str = "nb",
+    source_lang: str = "auto",
+    force: bool = False,
+    context_file: Optional[str] = None,
+    context_text: Optional[str] = None,
+    glossary: Optional[List[Dict[str, str]]] = None,
+    max_batch_tokens: Optional[int] = None,
+    log_callback=None,
+) -> str:
+    """
+    Submit every batch of a PO file as one OpenAI Batch API job.
+
+    Each line of the uploaded JSONL is the same request call_model() would
+    send, with ``custom_id`` = ``batch-<n>-<fingerprint>``. Returns the batch
+    job id; pass it to collect_po_batch_job() with the same unchanged file and
+    batch_size/max_batch_tokens/source_lang/force/target_lang.
+    """
+    def _log(msg):
+        if log_callback:
+            log_callback(msg)
+
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError("Please set OPENAI_API_KEY environment variable")
+
+    domain_context = load_context(context_file, context_text)
+
+    try:
+        po = polib.pofile(input_path, encoding="utf-8")
+    except Exception as e:
+        raise RuntimeError(f"Failed to load PO file: {e}")
+
+    work_items, id_map, total_entries = build_work_items(
+        po, source_lang=source_lang, force=force, target_lang=target_lang,
+    )
+    work_items, _trivial_count = copy_trivial_items(work_items, id_map)
+    if not work_items:
+        raise RuntimeError("Nothing to translate")
+
+    # Same batches as translate_po_file(); collect_po_batch_job() relies on it
+    unique_items, _fanout = items_to_send(work_items)
+    system_prompt = make_system_prompt(target_lang=target_lang, domain_context=domain_context, glossary=glossary)
+    batches = pack_batches(unique_items, max_items=batch_size, max_tokens=_batch_tokens(max_batch_tokens))
+    fingerprints = [_batch_fingerprint(batch) for batch in batches]
+    lines = [
+        _json_dumps({
+            "custom_id": f"batch-{n}-{fingerprints[n]}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": build_request(batch, model, system_prompt, target_lang=target_lang),
+        })
+        for n, batch in enumerate(batches)
+    ]
+
+    batch_client = get_batch_api_client()
+    upload = batch_client.files.create(
+        file=("po_translate_batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    job = batch_client.batches.create(
+        input_file_id=upload.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+        # Lets collect_po_batch_job() detect a file or options changed since submit
+        metadata={"po_batches": str(len(batches)), "po_fingerprint": _job_fingerprint(fingerprints)},
+    )
+    _log(f"Submitted batch job {job.id}: {len(work_items)} of {total_entries} entries in {len(lines)} requests")
+    return job.id
+
+
+def collect_po_batch_job(
+    batch_id: str,
+    input_path: str,
+    output_path: str,
+    *,
+    batch_size: int = 20,
+    target_lang: str = "nb",
+    source_lang: str = "auto",
+    force: bool = False,
+    max_batch_tokens: Optional[int] = None,
+    wait: float = 0.0,
+    poll_interval: float = 10.0,
+    log_callback=None,
+) -> Optional[Dict]:
+    """
+    Poll a Batch API job and, once finished, write its translations to *output_path*.
+
+    Polls with exponential backoff for up to *wait* seconds (0 = check once).
+    Returns None while the job is still running, otherwise the same summary
+    dict as translate_po_file().
+    """
+    def _log(msg):
+        if log_callback:
+            log_callback(msg)
+
+    batch_client = get_batch_api_client()
+    deadline = time.monotonic() + wait
+    delay = poll_interval
+    while True:
+        job = batch_client.batches.retrieve(batch_id)
+        if job.status in _BATCH_TERMINAL_STATES:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            counts = job.request_counts
+            done = f" ({counts.completed}/{counts.total} requests done)" if counts else ""
+            _log(f"Batch job {batch_id} is {job.status}{done}")
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 300.0)
+
+    if not job.output_file_id:
+        raise RuntimeError(f"Batch job {batch_id} ended with status '{job.status}' and no output")
+
+    try:
+        po = polib.pofile(input_path, encoding="utf-8")
+    except Exception as e:
+        raise RuntimeError(f"Failed to load PO file: {e}")
+
+    # Rebuilding with the submit-time options reproduces the same ids and batches
+    work_items, id_map, total_entries = build_work_items(
+        po, source_lang=source_lang, force=force, target_lang=target_lang,
+    )
+    total_to_translate = len(work_items)
+    work_items, translated_count = copy_trivial_items(work_items, id_map)
+    unique_items, fanout = items_to_send(work_items)
+    batches = pack_batches(unique_items, max_items=batch_size, max_tokens=_batch_tokens(max_batch_tokens))
+    fingerprints = [_batch_fingerprint(batch) for batch in batches]
+    mismatch = (
+        f"Batch job {batch_id} was submitted for different batches than {input_path} gives now; "
+        "the file or the batch_size/max_batch_tokens/source_lang/force/target_lang options changed since submit"
+    )
+    submitted = getattr(job, "metadata", None) or {}
+    if "po_fingerprint" in submitted and submitted["po_fingerprint"] != _job_fingerprint(fingerprints):
+        raise RuntimeError(mismatch)
+
+    placeholder_warnings: List[Dict] = []
+    failed_items: List[Dict] = []
+    answered = set()
+
+    output = batch_client.files.content(job.output_file_id).text
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        record = _json_loads(line)
+        custom_id = str(record.get("custom_id", ""))
+        match = _CUSTOM_ID_RE.fullmatch(custom_id)
+        if not match:
+            raise RuntimeError(f"Batch job {batch_id} has a result with unexpected custom_id {custom_id!r}")
+        n, fingerprint = int(match.group(1)), match.group(2)
+        # Jobs from before fingerprints carry only the index
+        if n >= len(batches) or (fingerprint and fingerprint != fingerprints[n]):
+            raise RuntimeError(mismatch)
+        batch = batches[n]
+        answered.add(n)
+        response = record.get("response") or {}
+        try:
+            if record.get("error") or response.get("status_code") != 200:
+                raise RuntimeError(str(record.get("error") or response.get("body")))
+            text = response["body"]["choices"][0]["message"]["content"]
+            translations = parse_translations(text)
+            translated_count += apply_translations(translations, batch, id_map, placeholder_warnings, fanout)
+        except Exception as e:
+            failed_items.extend(
+                {"id": dup_id, "text": item["text"], "error": str(e)}
+                for item in batch for dup_id in fanout[item["id"]]
+            )
+
+    for n, batch in enumerate(batches):
+        if n not in answered:
+            failed_items.extend(
+                {"id": dup_id, "text": item["text"], "error": f"No result (job {job.status})"}
+                for item in batch for dup_id in fanout[item["id"]]
+            )
+
+    save_po_atomic(po, output_path)
+    _log(f"Batch job {batch_id} {job.status}: {translated_count} translated, {len(failed_items)} failed")
 
     return {
         "translated": translated_count,
@@ -853,6 +2007,11 @@ def main():
                         help=f"OpenAI model (default: {defaults['model']}, from .env DEFAULT_MODEL)")
     parser.add_argument("--batch-size", type=int, default=defaults["batch_size"],
                         help=f"Items per API call (default: {defaults['batch_size']}, from .env BATCH_SIZE)")
+    parser.add_argument("--max-batch-tokens", type=int, default=defaults["max_batch_tokens"],
+                        help="Token budget per API call, source plus expected translation; long strings get "
+                             f"smaller batches (default: {defaults['max_batch_tokens']}, from .env MAX_BATCH_TOKENS)")
+    parser.add_argument("--concurrency", type=int, default=defaults["max_concurrency"],
+                        help=f"Batches in flight at once (default: {defaults['max_concurrency']}, from .env MAX_CONCURRENCY)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--force", action="store_true", help="Translate all entries (use msgstr if present, otherwise msgid)")
     parser.add_argument("--source-lang", choices=("auto","en","de"), default=defaults["source_lang"],
@@ -863,64 +2022,149 @@ def main():
                         help="Path to a context file with domain-specific instructions (from .env DEFAULT_CONTEXT_FILE)")
     parser.add_argument("--dry-run", action="store_true",
                         help="Show what would be translated without making API calls")
+    parser.add_argument("--batch-api", action="store_true",
+                        help="Submit the whole file as one OpenAI Batch API job (half price, results within 24h) and wait for it")
+    parser.add_argument("--batch-id",
+                        help="Collect an earlier --batch-api job instead of submitting a new one (use the same options)")
+    parser.add_argument("--cache", metavar="PATH",
+                        help="Translation cache database (default: .cache/translations.sqlite3 in the project)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Don't read or write the translation cache")
     args = parser.parse_args()
 
-    if not os.getenv("OPENAI_API_KEY"):
-        raise SystemExit("Please set OPENAI_API_KEY environment variable")
-
-    # --- Dry run: preview only, no API calls ---
+    # --- Dry run: preview only, no API calls (and no API key needed) ---
     if args.dry_run:
         domain_context = load_context(args.context_file)
         try:
             po = polib.pofile(args.input_po, encoding="utf-8")
         except Exception as e:
             raise SystemExit(f"Failed to load PO file: {e}")
-        work_items, _id_map, total_entries = build_work_items(po, source_lang=args.source_lang, force=args.force)
+        work_items, _id_map, total_entries = build_work_items(
+            po, source_lang=args.source_lang, force=args.force, target_lang=args.target_lang,
+        )
         total_to_translate = len(work_items)
+        send_items, _fanout = items_to_send(work_items)
         print(f"\n=== DRY RUN ===")
         print(f"Would translate {total_to_translate} / {total_entries} entries")
+        print(f"Unique texts sent to the API: {len(send_items)} (duplicates and trivial entries are copied)")
         print(f"Model: {args.model} | Batch size: {args.batch_size} | Target: {args.target_lang}")
-        print(f"Estimated API calls: {(total_to_translate + args.batch_size - 1) // args.batch_size}")
+        # The same packing translate_po_file() does, so the counts below match a real run
+        batches = pack_batches(send_items, max_items=args.batch_size, max_tokens=_batch_tokens(args.max_batch_tokens))
+        print(f"Estimated API calls: {len(batches)}")
+        try:
+            from src.cost_estimator import estimate_prompt_cost
+        except ImportError:  # run as a script from src/
+            from cost_estimator import estimate_prompt_cost
+        # Token counts come from the exact prompts the run would send
+        system_prompt = make_system_prompt(target_lang=args.target_lang, domain_context=domain_context)
+        cost = estimate_prompt_cost(
+            [(system_prompt, make_user_prompt(batch, args.target_lang)) for batch in batches],
+            [item["text"] for item in send_items],
+            args.model,
+        )
+        print(
+            f"Estimated tokens: {cost['estimated_input_tokens']:,} input + "
+            f"{cost['estimated_output_tokens']:,} output ({cost['tokenizer']})"
+        )
+        if args.batch_api:
+            print(f"Estimated cost: ~${cost['estimated_cost_usd'] / 2:.4f} with the Batch API discount")
+        else:
+            print(f"Estimated cost: ~${cost['estimated_cost_usd']:.4f} (about half with --batch-api)")
         if domain_context:
             print(f"Domain context: {args.context_file} ({len(domain_context)} chars)")
-        print("\nFirst 10 items that would be translated:")
-        for item in work_items[:10]:
+        print("\nFirst 10 items that would be sent, in batch order:")
+        for item in send_items[:10]:
             print(f"  [{item['lang']}] {item['text'][:80]}")
         return
 
+    if not os.getenv("OPENAI_API_KEY"):
+        raise SystemExit("Please set OPENAI_API_KEY environment variable")
+
     # --- Real run with tqdm progress ---
     pbar = None
 
+    last_n = 0
+
     def cli_progress(translated, total):
-        nonlocal pbar
+        nonlocal pbar, last_n
         if pbar is None:
-            pbar = tqdm(total=total, desc="Translating", unit="items")
-        pbar.n = translated
-        pbar.refresh()
+            # Let tqdm throttle redraws; batches can finish many times a second
+            pbar = tqdm(total=total, desc="Translating", unit="items",
+                        miniters=max(1, total // 200), mininterval=0.1)
+        pbar.update(translated - last_n)
+        last_n = translated
 
     def cli_log(msg):
         if args.verbose:
             print(msg)
 
-    try:
-        result = translate_po_file(
+    if args.batch_api or args.batch_id:
+        # --- Batch API: submit (or resume) one job and wait for its results ---
+        batch_id = args.batch_id or submit_po_batch_job(
             args.input_po,
-            args.output_po,
             model=args.model,
             batch_size=args.batch_size,
+            max_batch_tokens=args.max_batch_tokens,
             target_lang=args.target_lang,
             source_lang=args.source_lang,
             force=args.force,
             context_file=args.context_file,
-            progress_callback=cli_progress if not args.verbose else None,
             log_callback=cli_log,
         )
-    finally:
-        if pbar is not None:
-            pbar.close()
+        print(f"Waiting for Batch API job {batch_id} (Ctrl-C to stop; resume with --batch-id {batch_id})")
+        try:
+            result = collect_po_batch_job(
+                batch_id,
+                args.input_po,
+                args.output_po,
+                batch_size=args.batch_size,
+                max_batch_tokens=args.max_batch_tokens,
+                target_lang=args.target_lang,
+                source_lang=args.source_lang,
+                force=args.force,
+                wait=_BATCH_API_MAX_WAIT,
+                log_callback=cli_log,
+            )
+        except KeyboardInterrupt:
+            raise SystemExit(f"\nStopped waiting. Resume with --batch-id {batch_id}")
+        if result is None:
+            raise SystemExit(f"Batch job {batch_id} is still running. Resume with --batch-id {batch_id}")
+    else:
+        cache = None
+        if not args.no_cache:
+            try:
+                from src.translation_cache import TranslationCache
+            except ImportError:  # run as a script from src/
+                from translation_cache import TranslationCache
+            cache = TranslationCache(args.cache)
+
+        try:
+            result = translate_po_file(
+                args.input_po,
+                args.output_po,
+                model=args.model,
+                batch_size=args.batch_size,
+                max_batch_tokens=args.max_batch_tokens,
+                target_lang=args.target_lang,
+                source_lang=args.source_lang,
+                force=args.force,
+                context_file=args.context_file,
+                max_concurrency=args.concurrency,
+                cache=cache,
+                progress_callback=cli_progress if not args.verbose else None,
+                log_callback=cli_log,
+            )
+        finally:
+            if pbar is not None:
+                pbar.close()
+            if cache is not None:
+                cache.close()
 
     # --- Summary ---
     print(f"\n[OK] Successfully translated {result['translated']}/{result['total_to_translate']} entries")
+    usage = result.get("usage")
+    if usage and usage["prompt_tokens"]:
+        print(f"[OK] Prompt tokens: {usage['prompt_tokens']:,} ({usage['cached_tokens']:,} from prompt cache)")
 
     if result["placeholder_warnings"]:
         print(f"\n[WARN] {len(result['placeholder_warnings'])} translation(s) have missing placeholders:")
@@ -932,13 +2176,13 @@ def main():
             print(f"  ... and {len(result['placeholder_warnings']) - 20} more.")
         with open("placeholder_warnings.log", "w", encoding="utf-8") as f:
             for pw in result["placeholder_warnings"]:
-                f.write(json.dumps(pw, ensure_ascii=False) + "\n")
+                f.write(_json_dumps(pw) + "\n")
         print("  Full list saved to placeholder_warnings.log")
 
     if result["failed"]:
         with open("failed_items.log", "a", encoding="utf-8") as f:
             for fi in result["failed"]:
-                f.write(json.dumps(fi, ensure_ascii=False) + "\n")
+                f.write(_json_dumps(fi) + "\n")
         print(f"[WARN] {len(result['failed'])} item(s) failed -- see failed_items.log")
 
     print(f"[OK] Wrote: {result['output_path']}")
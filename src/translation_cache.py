@@ -0,0 +1,64 @@
+"""
+Persistent translation cache.
+
+Stores finished translations in a local SQLite file so re-running a file
+(after a small edit, or with a different batch size) only sends the
+entries that changed. Keys cover everything that shapes a translation:
+model, the full system prompt (target language, register, glossary,
+domain context), the item's detected source language and its text.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "translations.sqlite3"
+
+
+class TranslationCache:
+    """Key/value store of translations, safe to share between threads."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, translation TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, item: Dict[str, str]) -> str:
+        """Hash of everything that determines the translation of *item*."""
+        prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        raw = f"{model}|{prompt_hash}|{item.get('lang', '')}|{item['text']}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Return the cached translations for whichever of *keys* are present."""
+        found: Dict[str, str] = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+            found.update(rows)
+        return found
+
+    def set_many(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Store (key, translation) pairs, replacing existing entries."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation) VALUES (?, ?)", pairs
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -20,12 +20,14 @@ import os
 import re
 import json
 import copy
+import queue
+import asyncio
 import argparse
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, stop_after_attempt
 from dotenv import load_dotenv
 
 # ── Project root / env ────────────────────────────────────────────────────────
@@ -56,9 +58,23 @@ from src.po_translate_en_to_nb import (
     get_defaults,
     _normalise_lang,
     chunked,
-    client,          # already-initialised OpenAI client
+    dedupe_work_items,
     format_glossary_for_prompt,
+    run_on_client_loop,
+    AsyncOpenAI,
+    RateLimitError,
+    ConcurrencyLimiter,
+    record_usage,
     _REGISTER_NOTES,
+    _json_dumps,     # orjson when installed, else json
+    _json_loads,
+    TRANSLATIONS_RESPONSE_FORMAT,
+    _compile_linear,
+    _async_http_client,
+    _RETRYABLE_ERRORS,
+    _MAX_ATTEMPTS,
+    _log_retry,
+    _retry_wait,
 )
 
 # ── XML helpers ───────────────────────────────────────────────────────────────
@@ -310,23 +326,38 @@ def _make_xliff_user_prompt(items: List[Dict], target_lang: str) -> str:
         "For plain text items, translate directly.",
         "",
         "Items:",
-        json.dumps(api_items, ensure_ascii=False),
+        _json_dumps(api_items),
     ]
     return "\n".join(prompt_parts)
 
 
 # ── OpenAI call ───────────────────────────────────────────────────────────────
 
-@retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=2, max=20))
-def _call_model_xliff(
+# Same policy as the PO path: transport/rate-limit errors back off with
+# jitter (honouring Retry-After), bad responses fail fast into bisection.
+@retry(
+    stop=stop_after_attempt(_MAX_ATTEMPTS),
+    wait=_retry_wait,
+    retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+async def _call_model_xliff(
+    aclient: "AsyncOpenAI",
     batch: List[Dict],
     model: str,
+    system_prompt: str,
     target_lang: str = "nb",
-    domain_context: str = "",
-    glossary: Optional[List[Dict[str, str]]] = None,
+    log_callback=None,
+    usage_totals: Optional[Dict[str, int]] = None,
 ) -> Dict[str, str]:
-    """Send a batch of XLIFF items to the model; return {id: translated_content}."""
-    system_prompt = _make_xliff_system_prompt(target_lang, domain_context, glossary=glossary)
+    """
+    Send a batch of XLIFF items to the model; return {id: translated_content}.
+
+    *system_prompt* comes from _make_xliff_system_prompt(), built once per run.
+    Retries are reported through *log_callback* (pass it by keyword); token
+    usage is added to *usage_totals*.
+    """
     user_prompt   = _make_xliff_user_prompt(batch, target_lang)
 
     messages: Any = [
@@ -335,44 +366,31 @@ def _call_model_xliff(
     ]
 
     if model.startswith("gpt-5"):
-        resp = client.chat.completions.create(
+        resp = await aclient.chat.completions.create(
             model=model,
             messages=messages,
             temperature=0.1,
-            response_format={"type": "json_object"},
+            response_format=TRANSLATIONS_RESPONSE_FORMAT,
             max_completion_tokens=8192,
         )
     else:
-        resp = client.chat.completions.create(
+        resp = await aclient.chat.completions.create(
             model=model,
             messages=messages,
             temperature=0.1,
-            response_format={"type": "json_object"},
+            response_format=TRANSLATIONS_RESPONSE_FORMAT,
             max_tokens=8192,
         )
 
+    record_usage(usage_totals, getattr(resp, "usage", None))
     text = resp.choices[0].message.content or ""
 
+    # Structured outputs guarantee {"translations": [{id, translation}]};
+    # anything else is a bad response and falls through to the retry path
     try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        m = re.search(r"(\{.*\})", text, re.DOTALL)
-        data = json.loads(m.group(1)) if m else None
-
-    if data is None:
-        raise TypeError("Failed to parse JSON from model response")
-
-    # Normalise response envelope
-    if isinstance(data, dict):
-        if "translations" in data:
-            data = data["translations"]
-        elif "items" in data:
-            data = data["items"]
-        else:
-            data = next((v for v in data.values() if isinstance(v, list)), [])
-
-    if not isinstance(data, list):
-        raise TypeError(f"Expected a list, got {type(data).__name__}")
+        data = _json_loads(text)["translations"]
+    except (json.JSONDecodeError, KeyError, TypeError) as exc:
+        raise TypeError("Failed to parse JSON from model response") from exc
 
     return {
         str(item["id"]): item.get("translation")
@@ -383,18 +401,20 @@ def _call_model_xliff(
 
 # ── Validate placeholder survival ────────────────────────────────────────────
 
-_PH_RE = re.compile(
-    r"(%(?:\d+\$)?[-+0 #]*(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlLqjzt]*[diouxXeEfFgGaAcspn%])"
+_PH_RE = _compile_linear(
+    r"(?i)(%(?:\d+\$)?[-+0 #]*(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlLqjzt]*[diouxXeEfFgGaAcspn%])"
     r"|(%@)"
     r"|(\{\w*\})"
     r"|(https?://\S+)"
-    r"|(&[a-zA-Z]+;|&#\d+;)",
-    re.IGNORECASE,
+    r"|(&[a-zA-Z]+;|&#\d+;)"
 )
 
 def _validate_placeholders(source: str, translation: str) -> List[str]:
     src_ph = [m.group() for m in _PH_RE.finditer(source)]
-    return [ph for ph in src_ph if ph not in translation]
+    if not src_ph:
+        return []
+    trans_ph = {m.group() for m in _PH_RE.finditer(translation)}
+    return [ph for ph in src_ph if ph not in trans_ph and ph not in translation]
 
 
 # ── Main translate function ───────────────────────────────────────────────────
@@ -409,14 +429,19 @@ def translate_xliff_file(
     source_lang: str = "auto",
     force: bool = False,
     context_file: Optional[str] = None,
+    context_text: Optional[str] = None,
     glossary: Optional[List[Dict[str, str]]] = None,
+    max_concurrency: int = 8,
+    aclient: Optional["AsyncOpenAI"] = None,
     progress_callback=None,
     log_callback=None,
 ) -> Dict:
     """
     Translate an XLIFF 1.2 file and write the result to *output_path*.
 
-    Parameters mirror translate_po_file() for API compatibility.
+    Parameters mirror translate_po_file() for API compatibility: batches are
+    sent concurrently on the shared client loop, at most *max_concurrency*
+    at a time, and both callbacks are invoked on the calling thread.
 
     Returns a summary dict:
         {"translated", "total_entries", "total_to_translate",
@@ -429,7 +454,7 @@ def translate_xliff_file(
     if not os.getenv("OPENAI_API_KEY"):
         raise RuntimeError("Please set OPENAI_API_KEY environment variable")
 
-    domain_context = load_context(context_file)
+    domain_context = load_context(context_file, context_text)
     if domain_context:
         _log(f"Loaded domain context ({len(domain_context)} chars)")
 
@@ -452,63 +477,102 @@ def translate_xliff_file(
     total_to_translate = len(work_items)
     _log(f"Trans-units found: {total_entries} | To translate: {total_to_translate}")
 
+    # Translate each distinct source (markup included) once and copy it to its duplicates
+    unique_items, fanout = dedupe_work_items(work_items, key="source_xml")
+    if len(unique_items) < total_to_translate:
+        _log(f"{len(unique_items)} unique of {total_to_translate} trans-units")
+
     translated_count    = 0
     placeholder_warnings: List[Dict] = []
     failed_items:         List[Dict] = []
+    usage_totals:         Dict[str, int] = {"prompt_tokens": 0, "cached_tokens": 0}
+
+    # Identical for every batch in the run — build it once
+    system_prompt = _make_xliff_system_prompt(target_lang, domain_context, glossary=glossary)
+
+    events: "queue.Queue" = queue.Queue()
+
+    def _emit_log(msg: str) -> None:
+        if log_callback:
+            events.put((log_callback, (msg,)))
+
+    def _apply(item: Dict, trans: Optional[str]) -> None:
+        nonlocal translated_count
+        if trans is None:
+            return
+
+        # Placeholder check (compare against plain text form)
+        src_plain = item["text"]
+        missing_ph = _validate_placeholders(src_plain, re.sub(r"<[^>]+>", "", trans))
+        if missing_ph:
+            placeholder_warnings.append(
+                {
+                    "id":          item["id"],
+                    "source":      src_plain[:120],
+                    "translation": trans[:120],
+                    "missing":     missing_ph,
+                }
+            )
+
+        for dup_id in fanout[item["id"]]:
+            source_el, trans_unit_el = id_map[dup_id]
+            _set_target_content(trans_unit_el, trans, source_el)
+            translated_count += 1
 
     # ── Translate in batches ─────────────────────────────────────────────────
     # XLIFF markup items can have long source XML → use smaller effective batch
     # The caller's batch_size is respected but we cap at 10 for XML items
-    for batch in chunked(work_items, batch_size):
+    async def _translate_part(aclient_: "AsyncOpenAI", batch: List[Dict]) -> None:
         try:
-            translations = _call_model_xliff(
-                batch, model, target_lang=target_lang, domain_context=domain_context, glossary=glossary
-            )
+            async with limiter:
+                translations = await _call_model_xliff(
+                    aclient_, batch, model, system_prompt, target_lang=target_lang,
+                    log_callback=_emit_log, usage_totals=usage_totals,
+                )
+        except Exception as e:
+            if isinstance(e, RateLimitError):
+                limiter.backoff()
+                _emit_log(f"Rate limited; concurrency reduced to {limiter.limit}")
+            if len(batch) == 1:
+                failed_items.extend(
+                    {"id": dup_id, "text": batch[0]["text"], "error": str(e)}
+                    for dup_id in fanout[batch[0]["id"]]
+                )
+                return
+            # Same bisection as the PO path
+            _emit_log(f"Batch of {len(batch)} failed ({e}), retrying in halves…")
+            mid = len(batch) // 2
+            await asyncio.gather(_translate_part(aclient_, batch[:mid]), _translate_part(aclient_, batch[mid:]))
+            return
+
+        # Only the model call is retried; the results are applied exactly once
+        for item in batch:
+            _apply(item, translations.get(item["id"]))
+
+    async def _translate_batch(aclient_: "AsyncOpenAI", batch: List[Dict]) -> None:
+        await _translate_part(aclient_, batch)
 
-            for item in batch:
-                tid   = item["id"]
-                trans = translations.get(tid)
-                if trans is None:
-                    continue
+        if progress_callback:
+            events.put((progress_callback, (translated_count, total_to_translate)))
 
-                source_el, trans_unit_el = id_map[tid]
+    limiter = ConcurrencyLimiter(max_concurrency)
 
-                # Placeholder check (compare against plain text form)
-                src_plain = item["text"]
-                missing_ph = _validate_placeholders(src_plain, re.sub(r"<[^>]+>", "", trans))
-                if missing_ph:
-                    placeholder_warnings.append(
-                        {
-                            "id":          tid,
-                            "source":      src_plain[:120],
-                            "translation": trans[:120],
-                            "missing":     missing_ph,
-                        }
-                    )
+    async def _translate_all() -> None:
+        if aclient is not None:
+            await asyncio.gather(*(_translate_batch(aclient, b) for b in chunked(unique_items, batch_size)))
+            return
 
-                _set_target_content(trans_unit_el, trans, source_el)
-                translated_count += 1
+        # Retries are handled by _call_model_xliff() so they can be logged and jittered
+        async with AsyncOpenAI(max_retries=0, http_client=_async_http_client(max_concurrency)) as run_client:
+            await asyncio.gather(*(_translate_batch(run_client, b) for b in chunked(unique_items, batch_size)))
 
-        except Exception as e:
-            _log(f"Batch failed ({e}), retrying individually…")
-            for item in batch:
-                try:
-                    single = _call_model_xliff(
-                        [item], model, target_lang=target_lang, domain_context=domain_context, glossary=glossary
-                    )
-                    trans = single.get(item["id"])
-                    if trans is None:
-                        continue
-                    source_el, trans_unit_el = id_map[item["id"]]
-                    _set_target_content(trans_unit_el, trans, source_el)
-                    translated_count += 1
-                except Exception as single_e:
-                    failed_items.append(
-                        {"id": item["id"], "text": item["text"], "error": str(single_e)}
-                    )
+    run_on_client_loop(_translate_all(), events)
 
-        if progress_callback:
-            progress_callback(translated_count, total_to_translate)
+    if usage_totals["prompt_tokens"]:
+        _log(
+            f"Prompt tokens: {usage_totals['prompt_tokens']:,} "
+            f"({usage_totals['cached_tokens']:,} served from prompt cache)"
+        )
 
     # ── Write output ─────────────────────────────────────────────────────────
     # Preserve the original XML declaration and namespace attributes by
@@ -531,6 +595,7 @@ def translate_xliff_file(
         "placeholder_warnings": placeholder_warnings,
         "failed":           failed_items,
         "output_path":      output_path,
+        "usage":            usage_totals,
     }
 
 
@@ -557,6 +622,8 @@ def main() -> None:
                         help="Domain context file (.json/.txt)")
     parser.add_argument("--force", action="store_true",
                         help="Re-translate entries that already have a <target>")
+    parser.add_argument("--concurrency", type=int, default=defaults["max_concurrency"],
+                        help=f"Batches in flight at once (default: {defaults['max_concurrency']})")
     parser.add_argument("--verbose", "-v", action="store_true")
     args = parser.parse_args()
 
@@ -573,6 +640,7 @@ def main() -> None:
         source_lang=args.source_lang,
         force=args.force,
         context_file=args.context_file or None,
+        max_concurrency=args.concurrency,
         log_callback=_log,
     )
 
@@ -580,6 +648,9 @@ def main() -> None:
         f"Done — translated {result['translated']} / {result['total_to_translate']} "
         f"trans-units  ({result['total_entries']} total in file)"
     )
+    usage = result["usage"]
+    if usage["prompt_tokens"]:
+        print(f"  Prompt tokens: {usage['prompt_tokens']:,} ({usage['cached_tokens']:,} from prompt cache)")
     if result["placeholder_warnings"]:
         print(f"  ⚠  {len(result['placeholder_warnings'])} placeholder warning(s)")
     if result["failed"]:
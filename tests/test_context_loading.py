@@ -0,0 +1,15 @@
+from src.po_translate_en_to_nb import load_context
+
+
+def test_context_text_is_used_without_a_file():
+    assert load_context(context_text="  Garden machinery manuals.\n") == "Garden machinery manuals."
+
+
+def test_context_text_json_instructions_are_extracted():
+    assert load_context(context_text='{"instructions": "Use formal tone."}') == "Use formal tone."
+
+
+def test_context_file_still_supported(tmp_path):
+    ctx = tmp_path / "context.txt"
+    ctx.write_text("Lawn mowers", encoding="utf-8")
+    assert load_context(str(ctx)) == "Lawn mowers"
@@ -0,0 +1,23 @@
+from types import SimpleNamespace
+
+from src import cost_estimator
+from src.cost_estimator import count_tokens, estimate_prompt_cost
+
+
+def test_estimate_prompt_cost_counts_every_request():
+    prompts = [("system " * 50, "batch one"), ("system " * 50, "batch two")]
+    est = estimate_prompt_cost(prompts, ["Save", "Cancel"], "gpt-4.1-mini")
+    assert est["estimated_api_calls"] == 2
+    assert est["estimated_input_tokens"] >= 2 * count_tokens("system " * 50, "gpt-4.1-mini")
+    assert est["estimated_cost_usd"] > 0
+    assert est["pricing_per_1m"] == cost_estimator._MODEL_PRICING["gpt-4.1-mini"]
+
+
+def test_count_tokens_uses_tokenizer_when_available(monkeypatch):
+    monkeypatch.setattr(cost_estimator, "_encoding", lambda model: SimpleNamespace(encode=str.split))
+    count_tokens.cache_clear()
+    try:
+        assert count_tokens("one two three", "gpt-4.1") == 3
+        assert estimate_prompt_cost([("a b", "c")], [], "gpt-4.1")["tokenizer"] == "tiktoken"
+    finally:
+        count_tokens.cache_clear()
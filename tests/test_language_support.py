@@ -1,4 +1,13 @@
-from src.po_translate_en_to_nb import TARGET_LANGUAGES, _normalise_lang, make_system_prompt
+from src.po_translate_en_to_nb import (
+    TARGET_LANGUAGES,
+    _normalise_lang,
+    detect_lang,
+    lang_hints,
+    looks_english,
+    looks_german,
+    make_system_prompt,
+    make_user_prompt,
+)
 
 
 def test_new_target_languages_exist():
@@ -32,3 +41,27 @@ def test_system_prompt_uses_locale_name_and_guidance():
     assert "French (Canada)" in prompt_ca
     assert "US English" in prompt_us
     assert "UK English" in prompt_uk
+
+
+def test_system_prompt_is_independent_of_glossary_order():
+    glossary = [{"source": "throttle", "target": "gass"}, {"source": "Blade", "target": "kniv"}]
+    assert make_system_prompt("nb", "ctx", glossary) == make_system_prompt("nb", "ctx", glossary[::-1])
+
+
+def test_few_shot_example_is_in_system_prompt_only():
+    assert "Godta alle" in make_system_prompt("nb")
+    user = make_user_prompt([{"id": "1", "text": "Save", "lang": "en"}], "nb")
+    assert "Godta alle" not in user
+    assert user.endswith('[{"id":"1","text":"Save","lang":"en"}]')
+
+
+def test_language_heuristics():
+    assert looks_english("Save all settings")
+    assert not looks_english("Sävé settings")
+    assert looks_german("Größe")
+    assert looks_german("Kundenstimmen und Archiv")
+    assert not looks_german("Save")
+    assert detect_lang("Kundenstimmen und Archiv") == "de"
+    assert detect_lang("Save die settings") == "en"
+    assert detect_lang("Bonjour") == "en"
+    assert lang_hints("") == (False, False)
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import BadRequestError, RateLimitError
+
+from src.po_translate_en_to_nb import (
+    ConcurrencyLimiter,
+    RateLimiter,
+    _retry_wait,
+    call_model,
+    estimate_request_tokens,
+    run_on_client_loop,
+)
+
+
+def test_requests_bucket_blocks_when_empty():
+    async def run():
+        limiter = RateLimiter(max_requests_per_minute=1)
+        await asyncio.wait_for(limiter.acquire(100), timeout=0.5)
+        try:
+            await asyncio.wait_for(limiter.acquire(100), timeout=0.2)
+        except asyncio.TimeoutError:
+            return True
+        return False
+
+    assert asyncio.run(run())
+
+
+def test_tokens_bucket_refills_over_time():
+    async def run():
+        # 6000 tokens/min refills 100 tokens per second
+        limiter = RateLimiter(max_tokens_per_minute=6000)
+        await limiter.acquire(6000)
+        start = time.monotonic()
+        await limiter.acquire(20)
+        return time.monotonic() - start
+
+    assert 0.1 < asyncio.run(run()) < 1.0
+
+
+def test_disabled_limiter_never_waits():
+    async def run():
+        limiter = RateLimiter()
+        for _ in range(100):
+            await asyncio.wait_for(limiter.acquire(10_000), timeout=0.1)
+
+    asyncio.run(run())
+
+
+def test_estimate_counts_prompt_and_output_cap():
+    request = {
+        "messages": [{"role": "system", "content": "x" * 400}, {"role": "user", "content": "y" * 400}],
+        "max_tokens": 4096,
+    }
+    assert estimate_request_tokens(request) == 200 + 4096
+
+
+def test_concurrency_limiter_halves_then_recovers():
+    async def run():
+        limiter = ConcurrencyLimiter(8, cooldown=0.1)
+        limiter.backoff()
+        assert limiter.limit == 4
+        async with limiter:
+            pass
+        assert limiter.limit == 4  # still cooling down
+        await asyncio.sleep(0.15)
+        async with limiter:
+            pass
+        return limiter.limit
+
+    assert asyncio.run(run()) == 5
+
+
+def test_concurrency_limiter_wakes_waiter_when_slot_frees():
+    async def run():
+        limiter = ConcurrencyLimiter(1)
+        entered = asyncio.Event()
+
+        async def waiter():
+            async with limiter:
+                entered.set()
+
+        await limiter.__aenter__()
+        task = asyncio.create_task(waiter())
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert not entered.is_set()
+        await limiter.__aexit__(None, None, None)
+        # A few loop iterations, far less than any polling interval
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert entered.is_set()
+        await task
+
+    asyncio.run(run())
+
+
+def test_concurrency_limiter_caps_in_flight_calls():
+    async def run():
+        limiter = ConcurrencyLimiter(2)
+        peak = in_flight = 0
+
+        async def call():
+            nonlocal peak, in_flight
+            async with limiter:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        return peak
+
+    assert asyncio.run(run()) == 2
+
+
+def test_concurrency_limiter_built_off_loop_runs_on_client_loop():
+    # As in the app: built on a worker thread with no event loop, then
+    # used by batches running on the shared client loop
+    built = []
+    worker = threading.Thread(target=lambda: built.append(ConcurrencyLimiter(2)))
+    worker.start()
+    worker.join()
+    limiter = built[0]
+    peak = in_flight = 0
+
+    async def call():
+        nonlocal peak, in_flight
+        async with limiter:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    run_on_client_loop(run())
+    assert peak == 2
+
+
+def _retry_state(exc):
+    return SimpleNamespace(attempt_number=1, outcome=SimpleNamespace(exception=lambda: exc))
+
+
+def _rate_limit_error(headers):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def test_retry_wait_honours_retry_after():
+    assert _retry_wait(_retry_state(_rate_limit_error({"retry-after": "30"}))) >= 30
+    assert _retry_wait(_retry_state(_rate_limit_error({"retry-after-ms": "45000"}))) >= 45
+    # Capped, and falls back to the jittered backoff without a usable header
+    assert _retry_wait(_retry_state(_rate_limit_error({"retry-after": "3600"}))) <= 60
+    assert _retry_wait(_retry_state(_rate_limit_error({}))) <= 2
+
+
+def test_call_model_does_not_retry_client_errors():
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        raise BadRequestError("bad input", response=httpx.Response(400, request=request), body=None)
+
+    aclient = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    with pytest.raises(BadRequestError):
+        asyncio.run(call_model(aclient, [{"id": "1", "text": "Save"}], "gpt-4.1", "system"))
+    assert len(calls) == 1
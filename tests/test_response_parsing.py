@@ -0,0 +1,65 @@
+import json
+from types import SimpleNamespace
+
+import polib
+import pytest
+
+from src import po_translate_en_to_nb as engine
+from src.po_translate_en_to_nb import build_request, parse_translations
+
+
+def test_parse_translations_rejects_json_wrapped_in_prose(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # unparsable bodies are appended to raw_responses.log
+    text = 'Here you go:\n```json\n{"translations": [{"id": "1", "translation": "Lagre"}]}\n```'
+    with pytest.raises(TypeError):
+        parse_translations(text)
+
+
+def test_parse_translations_reads_schema_envelope():
+    text = '{"translations": [{"id": "1", "translation": "Lagre {name}"}]}'
+    assert parse_translations(text) == {"1": "Lagre {name}"}
+
+
+def test_build_request_uses_strict_schema():
+    body = build_request([{"id": "1", "text": "Save"}], "gpt-4.1", "system")
+    fmt = body["response_format"]
+    assert fmt["type"] == "json_schema"
+    assert fmt["json_schema"]["strict"] is True
+    item_schema = fmt["json_schema"]["schema"]["properties"]["translations"]["items"]
+    assert item_schema["required"] == ["id", "translation"]
+
+
+def _collect_with_results(monkeypatch, tmp_path, custom_ids, metadata=None):
+    src = tmp_path / "in.po"
+    po = polib.POFile()
+    po.append(polib.POEntry(msgid="Save", msgstr=""))
+    po.save(str(src))
+    body = {"choices": [{"message": {"content": '{"translations": [{"id": "1", "translation": "Lagre"}]}'}}]}
+    output = "\n".join(
+        json.dumps({"custom_id": cid, "response": {"status_code": 200, "body": body}}) for cid in custom_ids
+    )
+    job = SimpleNamespace(status="completed", output_file_id="file-1", metadata=metadata, request_counts=None)
+    client = SimpleNamespace(
+        batches=SimpleNamespace(retrieve=lambda batch_id: job),
+        files=SimpleNamespace(content=lambda file_id: SimpleNamespace(text=output)),
+    )
+    monkeypatch.setattr(engine, "get_batch_api_client", lambda: client)
+    return engine.collect_po_batch_job("batch_1", str(src), str(tmp_path / "out.po"))
+
+
+def test_collect_applies_results_whose_fingerprint_matches(monkeypatch, tmp_path):
+    fingerprint = engine._batch_fingerprint([{"id": "1", "text": "Save"}])
+    result = _collect_with_results(monkeypatch, tmp_path, [f"batch-0-{fingerprint}"])
+    assert result["translated"] == 1 and not result["failed"]
+
+
+@pytest.mark.parametrize("custom_id", ["batch-0-0123456789abcdef", "batch-3", "request-x"])
+def test_collect_rejects_results_for_other_batches(monkeypatch, tmp_path, custom_id):
+    with pytest.raises(RuntimeError, match="changed since submit|unexpected custom_id"):
+        _collect_with_results(monkeypatch, tmp_path, [custom_id])
+    assert not (tmp_path / "out.po").exists()
+
+
+def test_collect_checks_job_fingerprint_before_reading_results(monkeypatch, tmp_path):
+    with pytest.raises(RuntimeError, match="changed since submit"):
+        _collect_with_results(monkeypatch, tmp_path, [], metadata={"po_fingerprint": "0" * 32})
@@ -0,0 +1,58 @@
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import polib
+
+from src.po_translate_en_to_nb import translate_po_file
+from src.translation_cache import TranslationCache
+
+
+def test_round_trip(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.sqlite3"))
+    item = {"id": "1", "text": "Save", "lang": "en"}
+    key = cache.make_key("gpt-4.1", "system prompt", item)
+    assert cache.get_many([key]) == {}
+    cache.set_many([(key, "Lagre")])
+    assert cache.get_many([key]) == {key: "Lagre"}
+
+
+def test_key_depends_on_model_prompt_and_lang():
+    item = {"id": "1", "text": "Save", "lang": "en"}
+    key = TranslationCache.make_key("gpt-4.1", "prompt", item)
+    assert key == TranslationCache.make_key("gpt-4.1", "prompt", {**item, "id": "99"})
+    assert key != TranslationCache.make_key("gpt-4.1-mini", "prompt", item)
+    assert key != TranslationCache.make_key("gpt-4.1", "other prompt", item)
+    assert key != TranslationCache.make_key("gpt-4.1", "prompt", {**item, "lang": "de"})
+
+
+def test_cache_write_failure_does_not_resend_the_batch(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "x")
+    src = tmp_path / "in.po"
+    po = polib.POFile()
+    for text in ("Save", "Cancel", "Delete"):
+        po.append(polib.POEntry(msgid=text, msgstr=""))
+    po.save(str(src))
+
+    class BrokenCache(TranslationCache):
+        def set_many(self, pairs):
+            raise sqlite3.OperationalError("database is locked")
+
+    calls = []
+
+    async def create(**kwargs):
+        items = json.loads(kwargs["messages"][-1]["content"].split("\n", 1)[1])
+        calls.append(items)
+        body = {"translations": [{"id": i["id"], "translation": "NB:" + i["text"]} for i in items]}
+        message = SimpleNamespace(content=json.dumps(body))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    logs = []
+    aclient = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    result = translate_po_file(
+        str(src), str(tmp_path / "out.po"), aclient=aclient, cache=BrokenCache(str(tmp_path / "c.sqlite3")),
+        max_requests_per_minute=0, max_tokens_per_minute=0, log_callback=logs.append,
+    )
+    assert len(calls) == 1
+    assert result["translated"] == 3 and not result["failed"]
+    assert any("database is locked" in msg for msg in logs)
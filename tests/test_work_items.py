@@ -0,0 +1,253 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import polib
+import pytest
+
+from src import po_translate_en_to_nb as engine
+from src.po_translate_en_to_nb import (
+    apply_translations,
+    build_work_items,
+    classify_entry,
+    copy_trivial_items,
+    dedupe_work_items,
+    is_trivial,
+    items_to_send,
+    output_token_budget,
+    pack_batches,
+    save_po_atomic,
+    translate_po_file,
+    validate_placeholders,
+)
+
+
+def test_dedupe_keeps_first_occurrence_and_fans_out():
+    items = [
+        {"id": "1", "text": "Save"},
+        {"id": "2", "text": "Cancel"},
+        {"id": "3", "text": "Save"},
+    ]
+    unique, fanout = dedupe_work_items(items)
+    assert [it["id"] for it in unique] == ["1", "2"]
+    assert fanout == {"1": ["1", "3"], "2": ["2"]}
+
+
+def test_apply_translations_writes_every_duplicate():
+    entries = [polib.POEntry(msgid="Save"), polib.POEntry(msgid="Save")]
+    id_map = {"1": (entries[0], "msgid"), "3": (entries[1], "msgid")}
+    batch = [{"id": "1", "text": "Save"}]
+    applied = apply_translations({"1": "Lagre"}, batch, id_map, [], {"1": ["1", "3"]})
+    assert applied == 2
+    assert [e.msgstr for e in entries] == ["Lagre", "Lagre"]
+
+
+def test_trivial_entries_are_detected():
+    for text in ["42", "3.14", "  ", "%s", "%1$s", "{count}", "https://example.com/a", "support@example.com", "—", "...",
+                 "%s: %d", "%(count)d", "{count} / {total}", "<br/>", "<b>%(name)s</b>", "{0} - https://example.com"]:
+        assert is_trivial(text), text
+    for text in ["Save", "Save %s", "<b>Bold</b>", "[Draft]", "Visit https://example.com", "100% Cotton"]:
+        assert not is_trivial(text), text
+
+
+def test_tags_with_visible_attributes_are_not_trivial():
+    for text in ['<img alt="Open file">', '<abbr title="Frequently asked questions">', "<input placeholder='Search'/>",
+                 "<button aria-label=Close>"]:
+        assert not is_trivial(text), text
+    for text in ['<img src="logo.png">', '<img src="logo.png" alt="">', '<a href="https://example.com">']:
+        assert is_trivial(text), text
+
+
+def test_copy_trivial_items_writes_msgstr_verbatim():
+    entries = [polib.POEntry(msgid="42"), polib.POEntry(msgid="Save")]
+    id_map = {"1": (entries[0], "msgid"), "2": (entries[1], "msgid")}
+    items = [{"id": "1", "text": "42"}, {"id": "2", "text": "Save"}]
+    remaining, copied = copy_trivial_items(items, id_map)
+    assert copied == 1
+    assert [it["id"] for it in remaining] == ["2"]
+    assert entries[0].msgstr == "42"
+    assert entries[1].msgstr == ""
+
+
+def test_pack_batches_respects_item_and_token_limits():
+    short = [{"id": str(i), "text": "Save"} for i in range(12)]
+    assert [len(b) for b in pack_batches(short, max_items=5)] == [5, 5, 2]
+
+    long_text = "word " * 600  # ≈1000 tokens
+    items = [{"id": "a", "text": long_text}, {"id": "b", "text": long_text}, {"id": "c", "text": "OK"}]
+    batches = pack_batches(items, max_items=50, max_tokens=3000)
+    assert [[it["id"] for it in b] for b in batches] == [["a"], ["b", "c"]]
+
+
+def test_output_budget_scales_with_batch_and_is_capped():
+    small = output_token_budget([{"id": "1", "text": "Save"}])
+    assert 256 < small < 400
+    assert output_token_budget([{"id": "1", "text": "x" * 30000}]) == 4096
+
+
+def test_apply_translations_reports_source_of_each_result():
+    entries = {str(i): polib.POEntry(msgid=f"Item {i} %s") for i in range(50)}
+    id_map = {tid: (entry, "msgid") for tid, entry in entries.items()}
+    batch = [{"id": tid, "text": entry.msgid} for tid, entry in entries.items()]
+    warnings = []
+    # Results arrive in a different order from the batch
+    translations = {str(i): f"Element {i}" for i in reversed(range(50))}
+    assert apply_translations(translations, batch, id_map, warnings) == 50
+    assert {w["id"]: w["source"] for w in warnings} == {it["id"]: it["text"] for it in batch}
+
+def test_save_po_atomic_replaces_file_without_leftovers(tmp_path):
+    out = tmp_path / "out.po"
+    out.write_text("old", encoding="utf-8")
+    po = polib.POFile()
+    po.append(polib.POEntry(msgid="Save", msgstr="Lagre"))
+    save_po_atomic(po, str(out))
+    assert 'msgstr "Lagre"' in out.read_text(encoding="utf-8")
+    assert [p.name for p in tmp_path.iterdir()] == ["out.po"]
+
+
+def test_save_po_atomic_matches_polib_save(tmp_path):
+    po = polib.POFile()
+    po.header = "Title\nCopyright"
+    po.metadata = {"Content-Type": "text/plain; charset=UTF-8", "Language": "nb"}
+    po.metadata_is_fuzzy = 1
+    po.append(polib.POEntry(msgid="Old", msgstr="Gammel", obsolete=True))
+    po.append(polib.POEntry(msgid="Save " * 30, msgstr="Lagre", flags=["fuzzy"], occurrences=[("a.py", "1")]))
+    po.append(polib.POEntry(msgid="file", msgid_plural="files", msgstr_plural={0: "fil", 1: "filer"}, msgctxt="n"))
+    po.save(str(tmp_path / "expected.po"))
+    save_po_atomic(po, str(tmp_path / "out.po"))
+    assert (tmp_path / "out.po").read_bytes() == (tmp_path / "expected.po").read_bytes()
+
+
+class _Abort(BaseException):
+    pass
+
+
+def test_translate_po_file_keeps_progress_when_interrupted(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "x")
+    src, out = tmp_path / "in.po", tmp_path / "out.po"
+    po = polib.POFile()
+    for text in ("Save", "Cancel", "Stop here"):
+        po.append(polib.POEntry(msgid=text, msgstr=""))
+    po.save(str(src))
+
+    calls = []
+
+    async def create(**kwargs):
+        items = json.loads(kwargs["messages"][-1]["content"].split("\n", 1)[1])
+        calls.append(items)
+        if len(calls) == 3:
+            raise _Abort()
+        body = {"translations": [{"id": i["id"], "translation": "NB:" + i["text"]} for i in items]}
+        message = SimpleNamespace(content=json.dumps(body))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    # Entries must never be rendered on the client loop thread
+    render_threads = []
+    render = polib.POEntry.__unicode__
+    monkeypatch.setattr(polib.POEntry, "__unicode__", lambda self, *args: render_threads.append(
+        threading.current_thread().name) or render(self, *args))
+
+    aclient = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    with pytest.raises(_Abort):
+        translate_po_file(
+            str(src), str(out), batch_size=1, max_concurrency=1, aclient=aclient,
+            max_requests_per_minute=0, max_tokens_per_minute=0, checkpoint_interval=1e-9,
+        )
+    saved = polib.pofile(str(out))
+    assert saved.find("Save").msgstr == "NB:Save"
+    assert saved.find("Stop here").msgstr == ""
+    assert render_threads and "openai-client-loop" not in render_threads
+
+
+def test_validate_placeholders_reports_only_dropped_tokens():
+    src = "Hi {name}, you have %d new <b>messages</b> at https://example.com"
+    assert validate_placeholders(src, "Hei {name}, du har %d nye <b>meldinger</b> på (https://example.com)") == []
+    assert validate_placeholders(src, "Hei, du har nye meldinger") == [
+        "{name}", "%d", "<b>", "</b>", "https://example.com",
+    ]
+
+
+@pytest.mark.parametrize("use_re2", [False, True])
+def test_placeholder_pattern_matches_unicode_names_with_and_without_re2(use_re2, monkeypatch):
+    if use_re2:
+        pytest.importorskip("re2")
+    else:
+        monkeypatch.setattr(engine, "re2", None)
+    pattern = engine._compile_linear(engine._PLACEHOLDER_PATTERN)
+    assert type(pattern).__module__.startswith("re2") == use_re2
+    text = "Åpne {navn_på_fil}\u00a0nå: https://eksempel.no/side"
+    assert [m.group() for m in pattern.finditer(text)] == ["{navn_på_fil}", "https://eksempel.no/side"]
+
+
+def test_classify_entry_picks_source_field_and_language():
+    assert classify_entry("Größe wählen", "") == ("Größe wählen", "msgid", "de")
+    assert classify_entry("Kundenstimmen", "Customer settings") == ("Customer settings", "msgstr", "en")
+    assert classify_entry("Save", "Lagre", force=True) == ("Lagre", "msgstr", "en")
+    assert classify_entry("Lagre", "", source_lang="en") is None
+
+
+def test_build_work_items_skips_obsolete_entries():
+    po = polib.POFile()
+    po.append(polib.POEntry(msgid="Save", msgstr=""))
+    po.append(polib.POEntry(msgid="Old label", msgstr="", obsolete=True))
+    work_items, _, total = build_work_items(po)
+    assert [item["text"] for item in work_items] == ["Save"]
+    assert total == 1
+
+
+def test_build_work_items_skips_msgstr_already_in_target_language():
+    po = polib.POFile()
+    po.append(polib.POEntry(msgid="Save changes", msgstr="Lagre endringer på kjøretøy"))
+    po.append(polib.POEntry(msgid="Cancel", msgstr=""))
+    ids = lambda items: [it["text"] for it in items]
+    assert ids(build_work_items(po, target_lang="nb")[0]) == ["Cancel"]
+    assert ids(build_work_items(po, target_lang="sv")[0]) == ["Lagre endringer på kjøretøy", "Cancel"]
+    assert len(build_work_items(po, force=True, target_lang="nb")[0]) == 2
+
+
+def test_items_to_send_drops_trivial_and_duplicate_texts():
+    items = [{"id": str(i), "text": t} for i, t in enumerate(["Save", "42", "Save", "{name}", "Cancel"])]
+    unique_items, fanout = items_to_send(items)
+    assert [it["id"] for it in unique_items] == ["0", "4"]
+    assert fanout == {"0": ["0", "2"], "4": ["4"]}
+
+
+def test_items_to_send_orders_items_as_runs_pack_them():
+    items = [{"id": str(i), "text": t} for i, t in enumerate(["A longer sentence to translate", "Save", "Cancel"])]
+    unique_items, _fanout = items_to_send(items)
+    assert [it["id"] for it in unique_items] == ["1", "2", "0"]
+
+
+def test_dry_run_estimates_the_calls_a_real_run_makes(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("OPENAI_API_KEY", "x")
+    src = tmp_path / "in.po"
+    po = polib.POFile()
+    # Alternating paragraphs and labels pack into a different number of
+    # batches in file order than in the length order a run sends them in
+    for i in range(6):
+        po.append(polib.POEntry(msgid=f"Paragraph {i} " + "word " * 300, msgstr=""))
+        po.append(polib.POEntry(msgid=f"Label {i}", msgstr=""))
+    po.save(str(src))
+
+    monkeypatch.setattr("sys.argv", [
+        "po_translate_en_to_nb.py", str(src), str(tmp_path / "out.po"),
+        "--dry-run", "--batch-size", "50", "--max-batch-tokens", "1200",
+    ])
+    engine.main()
+    estimated = int(capsys.readouterr().out.split("Estimated API calls: ")[1].split()[0])
+
+    calls = []
+
+    async def create(**kwargs):
+        items = json.loads(kwargs["messages"][-1]["content"].split("\n", 1)[1])
+        calls.append(items)
+        body = {"translations": [{"id": i["id"], "translation": "NB:" + i["text"]} for i in items]}
+        message = SimpleNamespace(content=json.dumps(body))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    aclient = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    translate_po_file(
+        str(src), str(tmp_path / "out.po"), batch_size=50, max_batch_tokens=1200, aclient=aclient,
+        max_requests_per_minute=0, max_tokens_per_minute=0,
+    )
+    assert estimated == len(calls) == 7